@@ -0,0 +1,60 @@
+"""
+Encode/decode speed of every registered `DatabaseEncoder` on per-guild config trees.
+
+    python benchmarks/database_encoders.py [--guilds 1000] [--repeat 20]
+
+Only the backends installed in the current environment are measured (orjson, msgpack, libyaml are optional).
+"""
+import argparse
+import os
+import sys
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discordplus.database import DatabaseEncoder
+
+
+def guild_tree(guilds: int) -> dict:
+    return {
+        str(700000000000000000 + i): {
+            'prefix': '!',
+            'language': 'EN',
+            'welcome': {'enabled': i % 2 == 0, 'channel': 800000000000000000 + i, 'message': 'Welcome {User} to {Guild}!'},
+            'roles': {'mute': 900000000000000000 + i, 'auto': [900000000000000000 + i + j for j in range(5)]},
+            'disabled_commands': ['ping', 'help'] if i % 3 == 0 else [],
+            'economy': {'daily': 100, 'rate': 1.5},
+        }
+        for i in range(guilds)
+    }
+
+
+def measure(method, argument, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        method(argument)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--guilds', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    data = guild_tree(args.guilds)
+    print(f'{"encoder":<16} {"size (KB)":>10} {"encode (ms)":>12} {"decode (ms)":>12}')
+    for name, encoder in DatabaseEncoder.available().items():
+        encoded = encoder.encode(data)
+        if encoder.decode(encoded) != data:
+            print(f'{name:<16} does not round-trip the tree, skipped')
+            continue
+
+        encode = measure(encoder.encode, data, args.repeat)
+        decode = measure(encoder.decode, encoded, args.repeat)
+        print(f'{name:<16} {len(encoded) / 1024:>10.1f} {encode:>12.2f} {decode:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
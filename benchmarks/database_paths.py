@@ -0,0 +1,69 @@
+"""
+Per-call cost of reading a dotted path from a cached `JSONDatabase`.
+
+    python benchmarks/database_paths.py [--calls 100000]
+
+`legacy` is the resolution `get_data` used before paths were compiled: split on every call,
+`data.keys()` membership checks, `int(key)` attempts and a copy of the root dict.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discordplus.database import JSONDatabase
+
+
+def legacy_get_data(database: JSONDatabase, path: str):
+    data = database.load_data().copy()
+    for key in path.split('.'):
+        if isinstance(data, dict):
+            if key in data.keys():
+                data = data[key]
+            else:
+                return None
+        elif isinstance(data, list):
+            try:
+                data = data[int(key)]
+            except Exception:
+                return None
+        else:
+            return None
+    return data
+
+
+def measure(method, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        method()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+
+    data = {str(guild): {'settings': {'prefix': '!', 'roles': [1, 2, 3], 'welcome': {'channel': guild}}} for guild in range(500)}
+    with tempfile.TemporaryDirectory() as directory:
+        db = JSONDatabase(os.path.join(directory, 'guilds.json'), default_data=data, cached=True)
+        cases = {
+            'scalar': '250.settings.welcome.channel',
+            'list item': '250.settings.roles.1',
+            'subtree': '250.settings',
+        }
+
+        print(f'{"path":<10} {"legacy (us)":>12} {"get_data (us)":>14} {"view_data (us)":>15}')
+        for name, path in cases.items():
+            legacy = measure(lambda: legacy_get_data(db, path), args.calls)
+            get = measure(lambda: db.get_data(path), args.calls)
+            view = measure(lambda: db.view_data(path), args.calls)
+            print(f'{name:<10} {legacy:>12.2f} {get:>14.2f} {view:>15.2f}')
+
+
+if __name__ == '__main__':
+    main()
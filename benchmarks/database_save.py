@@ -0,0 +1,57 @@
+"""
+Save throughput of `JSONDatabase` under each `FsyncPolicy`.
+
+    python benchmarks/database_save.py [--writes 500] [--guilds 200]
+
+`set_data` writes once per call, `transaction` groups 20 writes into a single save like a command handler would.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discordplus.database import JSONDatabase, FsyncPolicy
+
+
+def guild_tree(guilds: int) -> dict:
+    return {str(100000 + i): {'prefix': '!', 'language': 'EN', 'welcome': {'channel': i, 'message': 'Welcome {User}!'}, 'roles': list(range(10))} for i in range(guilds)}
+
+
+def bench_set_data(db: JSONDatabase, writes: int) -> float:
+    start = time.perf_counter()
+    for i in range(writes):
+        db.set_data('100000.counter', i)
+    return writes / (time.perf_counter() - start)
+
+
+def bench_transaction(db: JSONDatabase, writes: int) -> float:
+    start = time.perf_counter()
+    for i in range(writes // 20):
+        with db.transaction():
+            for j in range(20):
+                db.set_data(f'100000.counter_{j}', i)
+    return writes / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writes', type=int, default=500)
+    parser.add_argument('--guilds', type=int, default=200)
+    args = parser.parse_args()
+
+    data = guild_tree(args.guilds)
+    with tempfile.TemporaryDirectory() as directory:
+        print(f'{"policy":<8} {"set_data/s":>12} {"transaction writes/s":>22}')
+        for policy in FsyncPolicy:
+            db = JSONDatabase(os.path.join(directory, f'{policy.value}.json'), default_data=data, cached=True, fsync=policy)
+            single = bench_set_data(db, args.writes)
+            grouped = bench_transaction(db, args.writes)
+            print(f'{policy.value:<8} {single:>12.0f} {grouped:>22.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Cost of `import discordplus.emotes` and of reading every `Emotes` attribute, each in a fresh interpreter.
+
+    python benchmarks/emotes_import.py [--repeat 3]
+
+`legacy` replays what the `Emotes` class body used to do at import time:
+one `pkgutil.get_data` + `yaml.safe_load` of the whole category file per attribute.
+"""
+import argparse
+import subprocess
+import sys
+
+IMPORT = '''
+import time
+import discordplus
+start = time.perf_counter()
+import discordplus.emotes
+print(time.perf_counter() - start)
+'''
+
+ACCESS = '''
+import time
+import discordplus
+start = time.perf_counter()
+from discordplus.emotes import Emotes
+for name in [name for name in vars(Emotes) if not name.startswith('_')]:
+    getattr(Emotes, name)
+print(time.perf_counter() - start)
+'''
+
+LEGACY = '''
+import pkgutil
+import re
+import time
+import yaml
+import discordplus.emotes
+source = pkgutil.get_data('discordplus.emotes', '__emotes.py').decode()
+lookups = re.findall(r"(\\w+)\\.(?:get|lazy)\\('(\\w+)'\\)", source) + [('Symbols', 'zero')] * 10 + [('Symbols', 'regional_indicator_a')] * 26
+start = time.perf_counter()
+for category, name in lookups:
+    yaml.safe_load(pkgutil.get_data('discordplus.emotes', f'{category.lower()}.yml')).get(name)
+print(time.perf_counter() - start)
+'''
+
+
+def measure(code: str, repeat: int) -> float:
+    runs = [float(subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout) for _ in range(repeat)]
+    return min(runs) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{"case":<22} {"time (ms)":>10}')
+    print(f'{"legacy import":<22} {measure(LEGACY, args.repeat):>10.1f}')
+    print(f'{"import":<22} {measure(IMPORT, args.repeat):>10.1f}')
+    print(f'{"import + every name":<22} {measure(ACCESS, args.repeat):>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Autocomplete over every emote category: `EmoteIndex.search` against scanning the categories.
+
+    python benchmarks/emotes_search.py [--calls 2000]
+
+`naive` parses every category file and scans it on each keystroke, `scan` scans the already loaded categories.
+Queries are the prefixes typed while writing a few names, e.g. `t`, `th`, `thu`, ...
+"""
+import argparse
+import os
+import pkgutil
+import sys
+import time
+
+import yaml
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discordplus.emotes import get_index
+from discordplus.emotes.__emotes import _categories
+
+WORDS = ('thumbsup', 'heart', 'arrow_up', 'pizza', 'regional_indicator_z')
+QUERIES = [word[:i] for word in WORDS for i in range(1, len(word) + 1)]
+
+
+def naive(query: str, limit: int = 25):
+    results = []
+    for category in _categories:
+        emotes = yaml.safe_load(pkgutil.get_data('discordplus.emotes', f'{category.category}.yml')) or {}
+        results.extend((str(name), emote) for name, emote in emotes.items() if str(name).startswith(query))
+    return sorted(results)[:limit]
+
+
+def scan(query: str, limit: int = 25):
+    return sorted((name, emote) for category in _categories for name, emote in category.load().items() if name.startswith(query))[:limit]
+
+
+def measure(method, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        method(QUERIES[i % len(QUERIES)])
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args()
+
+    index = get_index()
+    for query in QUERIES:
+        if index.search(query) != scan(query):
+            raise AssertionError(f'index and scan disagree on "{query}"')
+
+    print(f'{"method":<14} {"per query (us)":>15}')
+    print(f'{"naive":<14} {measure(naive, max(args.calls // 100, len(QUERIES))):>15.1f}')
+    print(f'{"scan":<14} {measure(scan, args.calls):>15.1f}')
+    print(f'{"index":<14} {measure(index.search, args.calls):>15.1f}')
+    print(f'{"index words":<14} {measure(lambda query: index.search(query, words=True), args.calls):>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
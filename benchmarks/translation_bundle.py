@@ -0,0 +1,65 @@
+"""
+Cold start of a `TranslationCatalog`: parsing every YAML file against loading the compiled bundle.
+
+    python benchmarks/translation_bundle.py [--languages 10] [--keys 300] [--repeat 5]
+
+A fresh catalog is built for every run, so each one pays the full load of every language.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discordplus.database.translation import TranslationCatalog, compile_bundle
+
+
+def write_translations(directory: str, languages: int, keys: int):
+    for i in range(languages):
+        language = f'L{i:02d}'
+        os.makedirs(os.path.join(directory, language))
+        errors = {
+            f'Error{j}': {
+                'title': f'Error {j} in {language}',
+                'description': 'Hey {User}, {Bot} could not run `{command}` ({reason})',
+                'fields': [{'name': 'Hint', 'value': 'Try `{Prefix}help {command}`', 'inline': False}],
+                'color': 0xFF0000,
+            }
+            for j in range(keys)
+        }
+        with open(os.path.join(directory, language, 'errors.yml'), 'w', encoding='utf8') as file:
+            yaml.safe_dump(errors, file, allow_unicode=True)
+
+
+def measure(directory: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        TranslationCatalog(directory).load()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--languages', type=int, default=10)
+    parser.add_argument('--keys', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_translations(directory, args.languages, args.keys)
+        yaml_time = measure(directory, args.repeat)
+        path = compile_bundle(directory)
+        bundle_time = measure(directory, args.repeat)
+
+        print(f'{"source":<8} {"load (ms)":>10}')
+        print(f'{"yaml":<8} {yaml_time:>10.1f}')
+        print(f'{"bundle":<8} {bundle_time:>10.1f}   ({os.path.getsize(path) / 1024:.1f} KB)')
+
+
+if __name__ == '__main__':
+    main()
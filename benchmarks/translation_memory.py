@@ -0,0 +1,63 @@
+"""
+Memory held by a loaded `TranslationCatalog`, per language and in total.
+
+    python benchmarks/translation_memory.py [--languages 10] [--keys 300]
+
+`tracemalloc` measures everything the catalog allocates, `memory_usage` is the catalog's own estimate.
+Half of each language is left untranslated, as it usually is, so those strings are shared with the reference.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import yaml
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discordplus.database.translation import TranslationCatalog
+
+
+def write_translations(directory: str, languages: int, keys: int):
+    for i in range(languages):
+        language = f'L{i:02d}'
+        os.makedirs(os.path.join(directory, language))
+        errors = {
+            f'Error{j}': {
+                'title': f'Error {j} in {language}' if j % 2 else f'Error {j}',
+                'description': 'Hey {User}, {Bot} could not run `{command}` ({reason})',
+                'fields': [{'name': 'Hint', 'value': 'Try `{Prefix}help {command}`', 'inline': False}],
+                'color': 0xFF0000,
+            }
+            for j in range(keys)
+        }
+        with open(os.path.join(directory, language, 'errors.yml'), 'w', encoding='utf8') as file:
+            yaml.safe_dump(errors, file, allow_unicode=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--languages', type=int, default=10)
+    parser.add_argument('--keys', type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_translations(directory, args.languages, args.keys)
+
+        tracemalloc.start()
+        catalog = TranslationCatalog(directory)
+        catalog.load()
+        allocated, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f'{"language":<10} {"estimate (KB)":>14}')
+        for language, size in catalog.memory_usage().items():
+            print(f'{language:<10} {size / 1024:>14.1f}')
+        print(f'{"paths":<10} {catalog.paths_memory_usage() / 1024:>14.1f}')
+        print(f'{"allocated":<10} {allocated / 1024:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
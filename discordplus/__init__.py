@@ -1,6 +1,6 @@
 from .classes import BotPlus, CogPlus, PreMessage, BotPlusConfig, SlashConfig
 from .lib import try_except, try_send, try_delete, try_add_reaction, async_wrapper, ExceptionValue, ExceptionFormat, ghost_ping, extract_number
-from .task import TaskPlus, TaskPlusStatus
+from .task import TaskPlus, TaskPlusStatus, TaskRunner, TaskScheduler, RunnerMetrics, export_prometheus
 
 
 # Doing overrides without affecting the import
@@ -1,3 +1,4 @@
 from .classes import BotPlus, CogPlus, BaseCommandPlus, CommandGroupPlus, CommandPlus
 from .configs import BotPlusConfig, SlashConfig
 from .models import PreMessage
+from .placeholders import PlaceholderContext
@@ -1,5 +1,6 @@
 import os
-from typing import Union, List, Dict
+import weakref
+from typing import Union, List, Dict, Optional
 
 from discord.ext.commands import Bot, Cog, ExtensionAlreadyLoaded, NoEntryPointError
 from discord_slash import SlashCommand
@@ -7,7 +8,9 @@ from discord_slash.cog_ext import cog_slash
 
 from .configs import BotPlusConfig
 from .models import PreMessage
+from .placeholders import PlaceholderContext
 from ..lib import ExceptionFormat
+from ..task import configure_executors, export_prometheus
 
 
 class BotPlus(Bot):
@@ -27,17 +30,46 @@ class BotPlus(Bot):
         if slash_config is not None:
             self._slash = SlashCommand(self, **slash_config.options)
 
+        configure_executors(config.task_thread_workers, config.task_process_workers)
+        self._tasks = weakref.WeakSet()
+
         from ..coglib import CogLib
         self._library = CogLib(self)
 
         self.api = None
+        # Set through `library.activate_command_error_handler(language_resolver=...)` to localize error messages
+        self.language_resolver = None
         self.__disabled_cogs__ = []
         self.__beta_cogs__ = []
 
+        # Counting guilds and users walks the whole cache, they are refreshed every `placeholder_ttl` seconds
+        self.placeholders = PlaceholderContext(self)
+        self.placeholders.register('Bot', lambda bot: bot.user.mention)
+        self.placeholders.register('BotID', lambda bot: bot.user.id)
+        self.placeholders.register('Prefix', lambda bot: bot.command_prefix)
+        self.placeholders.register('Guilds', lambda bot: len(bot.guilds), ttl=config.placeholder_ttl)
+        self.placeholders.register('Users', lambda bot: len(bot.users), ttl=config.placeholder_ttl)
+
     @property
     def library(self):
         return self._library
 
+    def register_task(self, task):
+        """
+        Called by every `TaskPlus` created for this bot, registered tasks are reported by `task_metrics`
+        """
+        self._tasks.add(task)
+
+    @property
+    def tasks(self) -> list:
+        return sorted(self._tasks, key=lambda task: task.name)
+
+    def task_metrics(self) -> Dict[str, Dict[str, dict]]:
+        return {task.name: task.metrics() for task in self.tasks}
+
+    def task_metrics_text(self) -> str:
+        return export_prometheus(self.tasks)
+
     def get_slash(self):
         return self._slash
 
@@ -98,7 +130,13 @@ class BotPlus(Bot):
         return super(BotPlus, self).run(self._token)
 
     def get_translation_dict(self) -> Dict[str, str]:
-        return {'Bot': self.user.mention, 'BotID': self.user.id, 'Prefix': self.command_prefix, 'Guilds': len(self.guilds), 'Users': len(self.users)}
+        return self.placeholders.as_dict()
+
+    def get_placeholder_context(self) -> Optional[PlaceholderContext]:
+        # A subclass overriding `get_translation_dict` keeps being asked for the whole dict
+        if type(self).get_translation_dict is not BotPlus.get_translation_dict:
+            return None
+        return self.placeholders
 
 
 class CogPlus(Cog):
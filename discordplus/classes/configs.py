@@ -22,5 +22,8 @@ class BotPlusConfig(Config, auto_setup=True):
     help_command = DefaultHelpCommand()
     description = None
     color = Color.default()
+    placeholder_ttl: float = 60
+    task_thread_workers: int = 4
+    task_process_workers: Optional[int] = None
 
     slash_config: Optional[SlashConfig] = None
@@ -25,6 +25,16 @@ def _data_to_embed(bot, data):
     return Embed.from_dict(embed)
 
 
+def _copy_args(args: dict) -> dict:
+    # Embeds are mutable, a copy must be changeable without touching the original
+    args = args.copy()
+    if isinstance(args.get('embed'), Embed):
+        args['embed'] = args['embed'].copy()
+    if args.get('embeds'):
+        args['embeds'] = [embed.copy() if isinstance(embed, Embed) else embed for embed in args['embeds']]
+    return args
+
+
 class PreMessage:
     def __init__(self, **kwargs):
         self.interaction_args = {}
@@ -73,8 +83,8 @@ class PreMessage:
 
     def copy(self) -> 'PreMessage':
         copy = PreMessage()
-        copy.messageable_args = self.messageable_args.copy()
-        copy.interaction_args = self.interaction_args.copy()
+        copy.messageable_args = _copy_args(self.messageable_args)
+        copy.interaction_args = _copy_args(self.interaction_args)
 
         return copy
 
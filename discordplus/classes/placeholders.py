@@ -0,0 +1,56 @@
+import time
+from typing import Callable, Any, Dict, Optional, Tuple, List
+
+
+class PlaceholderContext:
+    """
+    Placeholders of a bot computed only when a translation references them.
+    A placeholder registered with `ttl` keeps its value for that many seconds, otherwise it is computed on every use.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._getters: Dict[str, Tuple[Callable[[Any], Any], Optional[float]]] = {}
+        self._values: Dict[str, Tuple[float, Any]] = {}
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._getters.keys())
+
+    def register(self, name: str, getter: Callable[[Any], Any], ttl: float = None):
+        self._getters[name] = (getter, ttl)
+        self._values.pop(name, None)
+
+    def unregister(self, name: str):
+        self._getters.pop(name, None)
+        self._values.pop(name, None)
+
+    def invalidate(self, name: str = None):
+        if name is None:
+            self._values.clear()
+        else:
+            self._values.pop(name, None)
+
+    def get(self, name: str, default=None):
+        entry = self._getters.get(name)
+        if entry is None:
+            return default
+
+        getter, ttl = entry
+        if ttl is None:
+            return getter(self.bot)
+
+        now = time.monotonic()
+        cached = self._values.get(name)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        value = getter(self.bot)
+        self._values[name] = (now + ttl, value)
+        return value
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._getters
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: self.get(name) for name in self._getters}
@@ -1,6 +1,6 @@
 import json
 from threading import Thread
-from typing import Optional, Callable, Union
+from typing import Optional, Callable, Union, Dict
 
 from discord.ext.commands import Context
 from discord_slash import SlashContext
@@ -8,6 +8,7 @@ from flask import Flask, jsonify, request, Response
 from requests import post
 
 from .classes import CogPlus, BotPlus
+from .database.language import LanguageResolver
 from .database.translation import Translation
 from .errors import InteractionError, UnexpectedError
 from .extra import __agent__
@@ -24,6 +25,7 @@ class API(CogPlus):
         self.app.add_url_rule('/', None, self.ping)
         self.app.add_url_rule('/ping', None, self.ping)
         self.app.add_url_rule('/vote', None, self.vote, methods=['POST'])
+        self.app.add_url_rule('/metrics', None, self.metrics)
 
     def set_auth(self, auth):
         self._auth = auth
@@ -34,6 +36,9 @@ class API(CogPlus):
     def ping(self):
         return jsonify(Status='Online' if self.bot.is_ready() else 'Offline', Ping=self.bot.latency * 1000 if self.bot.is_ready() else 0)
 
+    def metrics(self):
+        return Response(self.bot.task_metrics_text(), mimetype='text/plain; version=0.0.4')
+
     def vote(self):
         req_auth = request.headers.get('Authorization')
         if self._auth == req_auth and self._auth is not None:
@@ -68,7 +73,7 @@ class TopGGPoster(TaskPlus):
             'Authorization': self.token
         }
 
-    @TaskPlus.execute
+    @TaskPlus.execute(executor='thread')
     def post(self):
         payload = {'server_count': len(self.bot.guilds)}
         if self.shard_count is not None:
@@ -79,8 +84,18 @@ class TopGGPoster(TaskPlus):
 
 
 class CommandErrorHandlerCog(CogPlus):
+    def __init__(self, bot: BotPlus):
+        super().__init__(bot)
+        self._translations: Dict[str, Translation] = {}
+
     def get_translation(self, ctx) -> Translation:
-        return Translation(self.bot, 'Errors')
+        resolver = self.bot.language_resolver
+        language = resolver.resolve(ctx) if resolver is not None else 'EN'
+
+        translation = self._translations.get(language)
+        if translation is None:
+            translation = self._translations[language] = Translation(self.bot, 'Errors', language)
+        return translation
 
     @CogPlus.listener()
     async def on_slash_command_error(self, ctx: SlashContext, exception: Exception):
@@ -118,10 +133,12 @@ class CogLib:
         self._TopGGTask.start()
         return self._TopGGTask
 
-    def activate_command_error_handler(self, translation_method: Callable[[CogPlus, Union[Context, SlashContext]], Translation] = None):
+    def activate_command_error_handler(self, translation_method: Callable[[CogPlus, Union[Context, SlashContext]], Translation] = None, language_resolver: LanguageResolver = None):
         if self._CEH:
             self.bot.remove_cog(self._CEH.qualified_name)
 
+        if language_resolver is not None:
+            self.bot.language_resolver = language_resolver
         self._CEH = CommandErrorHandlerCog(self.bot)
         if translation_method is not None:
             self._CEH.get_translation = translation_method
@@ -1,2 +1,4 @@
-from .database import JSONDatabase, YAMLDatabase, Database, DatabaseEncoder
-from .translation import Translation
+from .database import JSONDatabase, YAMLDatabase, ShardedDatabase, Database, DatabaseEncoder, FsyncPolicy
+from .sqlite import SQLiteDatabase, migrate_database
+from .translation import Translation, TranslationCatalog, PreMessageCache, TranslationReport, get_catalog, compile_bundle
+from .language import LanguageResolver
@@ -0,0 +1,49 @@
+import argparse
+import sys
+
+from .database import JSONDatabase, YAMLDatabase
+from .sqlite import migrate_database
+from .translation import compile_bundle
+
+
+def migrate(args):
+    if args.source.endswith(('.yml', '.yaml')):
+        source = YAMLDatabase(args.source, create_if_missing=False)
+    else:
+        source = JSONDatabase(args.source, create_if_missing=False)
+
+    database = migrate_database(source, args.target)
+    count = len(database.get_data())
+    database.close()
+    print(f'Migrated "{args.source}" into "{args.target}" ({count} top level keys)')
+
+
+def compile_translations(args):
+    path = compile_bundle(args.directory, args.output)
+    print(f'Compiled "{args.directory}" into "{path}"')
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m discordplus.database', description='Database and translation maintenance')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    migrate_parser = commands.add_parser('migrate', help='Migrates a JSON or YAML database file into a SQLite database')
+    migrate_parser.add_argument('source', help='.json, .yml or .yaml file to migrate')
+    migrate_parser.add_argument('target', help='SQLite file to create or overwrite')
+    migrate_parser.set_defaults(method=migrate)
+
+    compile_parser = commands.add_parser('compile-translations', help='Compiles every translation YAML file into a single bundle')
+    compile_parser.add_argument('directory', nargs='?', default='./translations', help='Translations directory, ./translations by default')
+    compile_parser.add_argument('-o', '--output', help='Bundle file, <directory>/translations.bundle by default')
+    compile_parser.set_defaults(method=compile_translations)
+
+    argv = sys.argv[1:]
+    if argv and not argv[0].startswith('-') and argv[0] not in commands.choices:
+        # `python -m discordplus.database <source> <target>` predates the sub commands
+        argv.insert(0, 'migrate')
+    args = parser.parse_args(argv)
+    args.method(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,87 @@
+import asyncio
+import atexit
+import codecs
+import copy
 import json
 import os
-from typing import Callable, Any
+import tempfile
+import threading
+import weakref
+from contextvars import ContextVar
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from contextlib import asynccontextmanager, contextmanager, suppress, ExitStack
+from enum import Enum
+from functools import lru_cache
+from typing import Callable, Any, Optional, Tuple, Dict, Union, List
 
 import yaml
 
+from .watcher import get_watcher
+from ..lib import ExceptionFormat
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 
 class DatabaseEncoder:
-    def encode(self, data: dict) -> str:
+    # Registered backends are looked up by `name`, `best` picks the highest `priority` of a `format`
+    name: str = None
+    format: str = None
+    priority: int = 0
+    binary: bool = False
+    # Binary encoders producing text in this charset, the database transcodes it to its own `encoding`
+    charset: Optional[str] = None
+
+    __encoders: Dict[str, 'DatabaseEncoder'] = {}
+
+    def encode(self, data: dict) -> Union[str, bytes]:
         raise NotImplementedError()
 
-    def decode(self, data: str) -> dict:
+    def decode(self, data: Union[str, bytes]) -> dict:
         raise NotImplementedError()
 
+    @staticmethod
+    def register(encoder: 'DatabaseEncoder') -> 'DatabaseEncoder':
+        if not encoder.name or not encoder.format:
+            raise ValueError(f"'{encoder.__class__.__name__}' requires both `name` and `format` to be registered")
+        DatabaseEncoder.__encoders[encoder.name] = encoder
+        return encoder
+
+    @staticmethod
+    def get(name: str) -> 'DatabaseEncoder':
+        try:
+            return DatabaseEncoder.__encoders[name]
+        except KeyError:
+            raise ValueError(f"No encoder named '{name}' is registered, available ones are {', '.join(DatabaseEncoder.__encoders)}") from None
+
+    @staticmethod
+    def best(format: str) -> Optional['DatabaseEncoder']:
+        encoders = [encoder for encoder in DatabaseEncoder.__encoders.values() if encoder.format == format]
+        return max(encoders, key=lambda encoder: encoder.priority) if encoders else None
+
+    @staticmethod
+    def available() -> Dict[str, 'DatabaseEncoder']:
+        return DatabaseEncoder.__encoders.copy()
+
     JSON: 'DatabaseEncoder' = None
+    JSON_COMPACT: 'DatabaseEncoder' = None
     YAML: 'DatabaseEncoder' = None
+    MSGPACK: Optional['DatabaseEncoder'] = None
 
 
 class __JSONEncoder(DatabaseEncoder):
+    name = 'json'
+    format = 'json'
+
     def encode(self, data: dict) -> str:
         return json.dumps(data, indent=2)
 
@@ -24,7 +89,53 @@ class __JSONEncoder(DatabaseEncoder):
         return json.loads(data)
 
 
+class __CompactJSONEncoder(DatabaseEncoder):
+    name = 'json-compact'
+    format = 'json-compact'
+
+    def encode(self, data: dict) -> str:
+        return json.dumps(data, separators=(',', ':'))
+
+    def decode(self, data: str) -> dict:
+        return json.loads(data)
+
+
+class __ORJSONEncoder(DatabaseEncoder):
+    # Opt-in only, orjson saves NaN and Infinity as null. Integers over 64 bits and files holding NaN fall back to json
+    name = 'orjson'
+    format = 'json'
+    priority = 10
+    binary = True
+    charset = 'utf8'
+
+    def encode(self, data: dict) -> bytes:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return json.dumps(data, indent=2).encode()
+
+    def decode(self, data: bytes) -> dict:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+
+
+class __CompactORJSONEncoder(__ORJSONEncoder):
+    name = 'orjson-compact'
+    format = 'json-compact'
+
+    def encode(self, data: dict) -> bytes:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return json.dumps(data, separators=(',', ':')).encode()
+
+
 class __YAMLEncoder(DatabaseEncoder):
+    name = 'yaml'
+    format = 'yaml'
+
     def encode(self, data: dict) -> str:
         return yaml.safe_dump(data)
 
@@ -32,12 +143,55 @@ class __YAMLEncoder(DatabaseEncoder):
         return yaml.safe_load(data)
 
 
-DatabaseEncoder.JSON = __JSONEncoder()
-DatabaseEncoder.YAML = __YAMLEncoder()
+class __CYAMLEncoder(DatabaseEncoder):
+    name = 'yaml-c'
+    format = 'yaml'
+    priority = 10
+
+    def encode(self, data: dict) -> str:
+        return yaml.dump(data, Dumper=yaml.CSafeDumper)
+
+    def decode(self, data: str) -> dict:
+        return yaml.load(data, Loader=yaml.CSafeLoader)
+
+
+class __MsgPackEncoder(DatabaseEncoder):
+    name = 'msgpack'
+    format = 'msgpack'
+    binary = True
+
+    def encode(self, data: dict) -> bytes:
+        return msgpack.packb(data, use_bin_type=True)
+
+    def decode(self, data: bytes) -> dict:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+DatabaseEncoder.register(__JSONEncoder())
+DatabaseEncoder.register(__CompactJSONEncoder())
+DatabaseEncoder.register(__YAMLEncoder())
+if orjson is not None:
+    DatabaseEncoder.register(__ORJSONEncoder())
+    DatabaseEncoder.register(__CompactORJSONEncoder())
+if getattr(yaml, '__with_libyaml__', False):
+    DatabaseEncoder.register(__CYAMLEncoder())
+if msgpack is not None:
+    DatabaseEncoder.register(__MsgPackEncoder())
+
+# orjson does not read nor write every file json does, it is picked by name or with `best('json')`
+DatabaseEncoder.JSON = DatabaseEncoder.get('json')
+DatabaseEncoder.JSON_COMPACT = DatabaseEncoder.get('json-compact')
+DatabaseEncoder.YAML = DatabaseEncoder.best('yaml')
+DatabaseEncoder.MSGPACK = DatabaseEncoder.best('msgpack')
 
 
 class DatabaseProperty:
-    def __init__(self, name, path=None, cast=None, get_wrapper: Callable[['Database', Any], Any] = None, set_validator: Callable[['Database', Any], bool] = None):
+    """
+    Data descriptor mapping an attribute to a path of the database.
+    With `memoize` the casted and wrapped value is reused until the cached tree changes, only for cached databases.
+    """
+
+    def __init__(self, name, path=None, cast=None, get_wrapper: Callable[['Database', Any], Any] = None, set_validator: Callable[['Database', Any], bool] = None, memoize: bool = False):
         if path is None:
             path = name
 
@@ -46,6 +200,25 @@ class DatabaseProperty:
         self.cast = cast
         self.get_wrapper = get_wrapper
         self.set_validator = set_validator
+        self.memoize = memoize
+
+    def __get__(self, database: Optional['Database'], owner=None):
+        if database is None:
+            return self
+
+        if not self.memoize or not database._refresh():
+            return self.fget(database)
+
+        memo = database._memo.get(self.name)
+        if memo is not None and memo[0] == database._version:
+            return memo[1]
+
+        value = self.fget(database)
+        database._memo[self.name] = (database._version, value)
+        return value
+
+    def __set__(self, database: 'Database', value):
+        self.fset(database, value)
 
     def fget(self, database: 'Database'):
         if self.get_wrapper:
@@ -60,120 +233,943 @@ class DatabaseProperty:
             raise ValueError(f"value '{value}' is not acceptable by '{self.name}'")
 
 
+class FsyncPolicy(str, Enum):
+    """
+    `Never` leaves writing the file back to the OS, as saves always did.
+    `Commit` syncs every commit: a plain `set_data`, `remove` or `save_data`, a transaction or a flush of deferred writes.
+    Writes held by `flush_interval` or by an open transaction are synced once they are written.
+    `Always` is the same for file databases, SQLite also syncs its journal more eagerly.
+    """
+    Never = 'never'
+    Commit = 'commit'
+    Always = 'always'
+
+
+# Read once, new database files get the same permissions `open(mode='w')` would have given them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _fsync_directory(directory: str):
+    # Makes the rename itself durable, directories can not be opened on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _atomic_write(file_path: str, content: Union[str, bytes], encoding: str, sync: bool):
+    directory = os.path.dirname(os.path.abspath(file_path))
+    try:
+        mode = os.stat(file_path).st_mode & 0o777
+    except OSError:
+        mode = 0o666 & ~_UMASK
+
+    fd, temp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(file_path)}.', suffix='.tmp', dir=directory)
+    try:
+        binary = isinstance(content, bytes)
+        with os.fdopen(fd, mode='wb' if binary else 'w', encoding=None if binary else encoding) as file:
+            file.write(content)
+            if sync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+    if sync:
+        _fsync_directory(directory)
+
+
+# Databases with deferred writes, flushed at exit without keeping a database alive once it is dropped
+_deferred: 'weakref.WeakSet[Database]' = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_deferred():
+    for database in list(_deferred):
+        try:
+            database.flush()
+        except Exception as error:
+            ExceptionFormat(error).print(message=f'Unable to flush "{database._file_path}" at exit')
+
+
+# One asyncio lock per file, shared by every database object pointing at it
+_async_locks: 'weakref.WeakValueDictionary[str, asyncio.Lock]' = weakref.WeakValueDictionary()
+
+
+# Transactions opened by the current context, tasks started inside one inherit it and may join it
+_transactions: ContextVar[Tuple[object, ...]] = ContextVar('database_transactions', default=())
+
+
+@lru_cache(maxsize=4096)
+def _compile_path(path: str) -> Tuple[Tuple[str, Optional[int]], ...]:
+    # Each key with its list index, if it can be one, so walking a path never splits nor parses again
+    compiled = []
+    for key in path.split('.'):
+        try:
+            index = int(key)
+        except ValueError:
+            index = None
+        compiled.append((key, index))
+    return tuple(compiled)
+
+
+def _view(value):
+    if isinstance(value, dict):
+        return ReadOnlyDict(value)
+    if isinstance(value, list):
+        return ReadOnlyList(value)
+    return value
+
+
+class ReadOnlyDict(Mapping):
+    """
+    Live read-only view of a dict inside a database tree, `copy` returns a detached snapshot
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data: dict):
+        self._data = data
+
+    def __getitem__(self, key):
+        return _view(self._data[key])
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._data!r})'
+
+    def copy(self) -> dict:
+        return copy.deepcopy(self._data)
+
+
+class ReadOnlyList(Sequence):
+    """
+    Live read-only view of a list inside a database tree, `copy` returns a detached snapshot
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data: list):
+        self._data = data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ReadOnlyList(self._data[index])
+        return _view(self._data[index])
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, ReadOnlyList):
+            other = other._data
+        return self._data == other
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._data!r})'
+
+    def copy(self) -> list:
+        return copy.deepcopy(self._data)
+
+
+def _file_stamp(file_path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _ChangeListener:
+    def __init__(self, path: Optional[str], callback: Callable[['Database', Optional[str], Any], Any], value):
+        self.path = path
+        self.callback = callback
+        self.value = value
+        # Callbacks run on the loop they were registered from, the watcher thread never touches it directly
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.loop = None
+
+    def fire(self, database: 'Database', value):
+        if asyncio.iscoroutinefunction(self.callback):
+            if self.loop is None:
+                raise RuntimeError(f'Coroutine callback "{self.callback}" must be registered from a running event loop')
+            asyncio.run_coroutine_threadsafe(self.callback(database, self.path, value), self.loop)
+        elif self.loop is not None:
+            self.loop.call_soon_threadsafe(self.callback, database, self.path, value)
+        else:
+            self.callback(database, self.path, value)
+
+
 class Database:
-    def __init__(self, file_path: str, encoder: DatabaseEncoder, create_if_missing: bool = True, default_data=None, encoding='utf8'):
+    def __init__(self, file_path: str, encoder: DatabaseEncoder, create_if_missing: bool = True, default_data=None, encoding='utf8', *, cached: bool = False, flush_interval: float = None, fsync: FsyncPolicy = FsyncPolicy.Never):
         self._file_path = file_path
         self._encoding = encoding
         self._encoder = encoder
+        self._init_state(cached, flush_interval, fsync)
 
         if not os.path.exists(self._file_path):
             if create_if_missing:
-                os.makedirs(self._file_path[:self._file_path.rfind('/')], exist_ok=True)
-                self.save_data(default_data or {})
+                os.makedirs(os.path.dirname(self._file_path) or '.', exist_ok=True)
+                self.save_data(copy.deepcopy(default_data) if default_data else {})
             else:
                 raise FileNotFoundError(f'"{self._file_path}" does not exists')
 
+    def _init_state(self, cached: bool, flush_interval: Optional[float], fsync: FsyncPolicy):
+        self._fsync = FsyncPolicy(fsync)
+
+        # Decoded tree kept in memory while `cached` is enabled, it is trusted as long as the file stamp (mtime, size) stays the same
+        self._cached = cached
+        self._cache = None
+        self._cache_stamp = None
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # In-memory tree which receives writes of an open transaction or, with `flush_interval`, deferred writes until flushed
+        self._lock = threading.RLock()
+        self._pending = None
+        self._dirty = False
+        self._depth = 0
+        # Token of the outermost transaction, only async calls made from the context which opened it may join it
+        self._owner = None
+        self._owner_reset = None
+        self._flush_interval = flush_interval
+        self._flush_timer = None
+        self._async_lock = None
+
+        # Bumped on every change of the in-memory tree, memoized property values are only valid for one version
+        self._version = 0
+        self._memo: Dict[str, Tuple[int, Any]] = {}
+
+        # Callbacks registered with `on_change`, the file is watched once the first one is added
+        self._listeners: List[_ChangeListener] = []
+        self._watching = False
+
+        if flush_interval is not None:
+            if flush_interval <= 0:
+                raise ValueError(f"flush_interval must be positive not '{flush_interval}'")
+            _deferred.add(self)
+
+    @property
+    def cached(self) -> bool:
+        return self._cached
+
+    @property
+    def cache_hits(self) -> int:
+        return self._cache_hits
+
+    @property
+    def cache_misses(self) -> int:
+        return self._cache_misses
+
+    @property
+    def fsync(self) -> FsyncPolicy:
+        return self._fsync
+
+    @property
+    def flush_interval(self) -> Optional[float]:
+        return self._flush_interval
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def invalidate_cache(self):
+        self._cache = None
+        self._cache_stamp = None
+        self._version += 1
+
+    def reset_cache_stats(self):
+        self._cache_hits = 0
+        self._cache_misses = 0
+
     def save_data(self, data: dict):
-        with open(file=self._file_path, mode='w', encoding=self._encoding) as file:
-            file.write(self._encoder.encode(data))
+        # A save outside of a transaction or a flush is a commit on its own
+        self._save(data, self._fsync is not FsyncPolicy.Never)
+
+    def _save(self, data: dict, sync: bool):
+        # Written to a sibling temp file and renamed over the target, readers never see a partial file
+        try:
+            content = self._encoder.encode(data)
+            if self._transcoded():
+                content = content.decode(self._encoder.charset)
+            _atomic_write(self._file_path, content, self._encoding, sync)
+        except Exception:
+            self.invalidate_cache()
+            raise
+
+        self._version += 1
+        if self._cached:
+            # Write-through, the saved tree becomes the cached one
+            self._cache = data
+            self._cache_stamp = _file_stamp(self._file_path)
+
+    def _transcoded(self) -> bool:
+        # Text written by a binary encoder in another charset than `encoding`, it goes through str instead of bytes
+        charset = self._encoder.charset
+        return charset is not None and codecs.lookup(charset).name != codecs.lookup(self._encoding).name
 
     def load_data(self) -> dict:
-        with open(file=self._file_path, mode='r', encoding=self._encoding) as file:
-            return self._encoder.decode(file.read())
+        if self._cached:
+            stamp = _file_stamp(self._file_path)
+            if self._cache is not None and stamp is not None and stamp == self._cache_stamp:
+                self._cache_hits += 1
+                return self._cache
+            self._cache_misses += 1
+
+        if self._encoder.binary and not self._transcoded():
+            with open(file=self._file_path, mode='rb') as file:
+                data = self._encoder.decode(file.read())
+        else:
+            with open(file=self._file_path, mode='r', encoding=self._encoding) as file:
+                data = self._encoder.decode(file.read())
+
+        if self._cached:
+            self._cache = data
+            self._cache_stamp = stamp
+            self._version += 1
+        return data
+
+    def _fresh_tree(self) -> dict:
+        data = self.load_data()
+        return copy.deepcopy(data) if self._cached else data
+
+    def _read_tree(self) -> Tuple[dict, bool]:
+        pending = self._pending
+        if pending is not None:
+            return pending, True
+        return self.load_data(), self._cached
+
+    def _memory_tree(self) -> Optional[dict]:
+        # The tree when it can be served without reading the file, a stat is all it costs
+        pending = self._pending
+        if pending is not None:
+            return pending
+
+        cache = self._cache
+        if self._cached and cache is not None and _file_stamp(self._file_path) == self._cache_stamp:
+            self._cache_hits += 1
+            return cache
+        return None
+
+    def _write_tree(self) -> dict:
+        if self._pending is None and self._flush_interval is not None:
+            self._pending = self._fresh_tree()
+            self._dirty = False
+        if self._pending is not None:
+            return self._pending
+        return self.load_data()
+
+    def _commit_tree(self, data: dict):
+        if data is not self._pending:
+            self.save_data(data)
+            return
+
+        self._dirty = True
+        self._version += 1
+        if self._depth == 0:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self._flush_interval, self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._flush_timer = None
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._depth > 0:
+                return
+
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            pending, dirty = self._pending, self._dirty
+            self._pending = None
+            self._dirty = False
+            if pending is not None and dirty:
+                try:
+                    self._save(pending, self._fsync is not FsyncPolicy.Never)
+                except Exception:
+                    if self._flush_interval is not None:
+                        # Keep the deferred writes around so the next flush can retry them
+                        self._pending = pending
+                        self._dirty = True
+                    raise
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._pending is None:
+                snapshot = None
+                self._pending = self._fresh_tree()
+                self._dirty = False
+            else:
+                snapshot = copy.deepcopy(self._pending), self._dirty
+
+            self._enter()
+            try:
+                yield self
+            except BaseException:
+                if snapshot is None:
+                    self._pending = None
+                    self._dirty = False
+                else:
+                    self._pending, self._dirty = snapshot
+                self._version += 1
+                raise
+            finally:
+                self._exit()
+
+            if self._depth == 0 and self._dirty:
+                if self._flush_interval is None:
+                    self.flush()
+                else:
+                    self._schedule_flush()
+            elif self._depth == 0 and self._flush_interval is None:
+                self._pending = None
+
+    @asynccontextmanager
+    async def atransaction(self):
+        """
+        `transaction` for coroutines, async writes of other tasks to the same file wait until it is committed or rolled back
+        """
+        if self._owns_transaction():
+            with self.transaction():
+                yield self
+            return
+
+        async with self._get_async_lock():
+            with self.transaction():
+                yield self
+
+    def _enter(self):
+        self._depth += 1
+        if self._depth == 1:
+            self._owner = object()
+            self._owner_reset = _transactions.set(_transactions.get() + (self._owner,))
+
+    def _exit(self):
+        self._depth -= 1
+        if self._depth == 0:
+            with suppress(ValueError):
+                _transactions.reset(self._owner_reset)
+            self._owner = None
+            self._owner_reset = None
+
+    def _owns_transaction(self) -> bool:
+        owner = self._owner
+        return self._depth > 0 and owner is not None and owner in _transactions.get()
 
     def get_data(self, path: str = None, cast: type = None):
-        data = self.load_data().copy()
+        # Writers change the pending and cached trees in place, the snapshot is taken while none of them runs
+        with self._lock:
+            data, shared = self._read_tree()
+            return self._resolve(data, shared, path, cast)
+
+    @staticmethod
+    def _walk(data, path: Optional[str]):
         if path is None:
             return data
 
-        pattern = path.split('.')
-        for key in pattern:
+        for key, index in _compile_path(path):
             if isinstance(data, dict):
-                if key in data.keys():
+                try:
                     data = data[key]
-                else:
+                except KeyError:
                     return None
             elif isinstance(data, list):
+                if index is None:
+                    return None
                 try:
-                    data = data[int(key)]
-                except Exception:
+                    data = data[index]
+                except IndexError:
                     return None
             else:
                 return None
+        return data
 
+    @staticmethod
+    def _resolve(data, shared: bool, path: str = None, cast: type = None):
+        data = Database._walk(data, path)
+        if shared and isinstance(data, (dict, list)):
+            # Never hand out the cached or pending containers, a caller mutating them would corrupt them
+            data = copy.deepcopy(data)
+        return data if cast is None or data is None or path is None else cast(data)
+
+    def view_data(self, path: str = None, cast: type = None):
+        """
+        Same as `get_data` without the snapshot, containers come back as live `ReadOnlyDict`/`ReadOnlyList` views.
+        Reading a scalar from a cached database allocates nothing.
+        """
+        data = self._walk(self._read_tree()[0], path)
+        if isinstance(data, (dict, list)):
+            return _view(data)
         return data if cast is None or data is None else cast(data)
 
     def set_data(self, path: str, value, default: bool = False):
-        original = self.load_data().copy()
-        data = original
+        with self._lock:
+            original = self._write_tree()
+            data = original
 
-        pattern = path.split('.')
+            *parents, (last, _) = _compile_path(path)
 
-        for key in pattern[:-1]:
-            if key in data.keys():
-                data = data[key]
-            else:
-                data[key] = {}
-                data = data[key]
+            for key, _ in parents:
+                try:
+                    data = data[key]
+                except KeyError:
+                    child = data[key] = {}
+                    data = child
 
-        if default is False or pattern[-1] not in data.keys():
-            data[pattern[-1]] = value
+            if default is False or last not in data:
+                data[last] = value
 
-        self.save_data(original)
+            self._commit_tree(original)
 
     def exists(self, path: str) -> bool:
-        return self.get_data(path) is not None
+        return self.view_data(path) is not None
 
     def remove(self, path):
-        data = self.load_data()
+        with self._lock:
+            data = self._write_tree()
 
-        pattern = path.split('.')
+            *parents, (last, _) = _compile_path(path)
 
-        target = data
-        for key in pattern[:-1]:
-            if key in target.keys():
-                target = target[key]
-            else:
+            target = data
+            for key, _ in parents:
+                try:
+                    target = target[key]
+                except KeyError:
+                    return False
+
+            if last not in target:
                 return False
+            target.pop(last)
+            self._commit_tree(data)
+            return True
 
-        if pattern[-1] not in target.keys():
-            return False
-        target.pop(pattern[-1])
-        self.save_data(data)
-        return True
+    def on_change(self, path: Optional[str], callback: Callable[['Database', Optional[str], Any], Any]):
+        """
+        Calls `callback(database, path, value)` whenever the value at `path` (the whole tree if `None`) changes.
+        The file is watched, edits made by hand or by another process invalidate the cache and fire the callbacks too.
+        """
+        with self._lock:
+            self._listeners.append(_ChangeListener(path, callback, self.get_data(path)))
+            if not self._watching:
+                self._watch()
+                self._watching = True
+
+    def remove_change_listener(self, callback: Callable[['Database', Optional[str], Any], Any]):
+        with self._lock:
+            self._listeners = [listener for listener in self._listeners if listener.callback != callback]
+            if not self._listeners and self._watching:
+                self._unwatch()
+                self._watching = False
+
+    def _watch(self):
+        get_watcher().watch(self._file_path, self._file_changed)
+
+    def _unwatch(self):
+        get_watcher().unwatch(self._file_path, self._file_changed)
+
+    def _set_file_path(self, file_path: str):
+        with self._lock:
+            if self._watching:
+                self._unwatch()
+            self._file_path = file_path
+            if self._watching:
+                self._watch()
+            self.invalidate_cache()
+
+    def _file_changed(self):
+        with self._lock:
+            if self._cached and _file_stamp(self._file_path) != self._cache_stamp:
+                self.invalidate_cache()
+
+            for listener in list(self._listeners):
+                try:
+                    value = self.get_data(listener.path)
+                except Exception:
+                    # Half written by an editor or deleted, the next event will bring the final content
+                    continue
+                if value != listener.value:
+                    listener.value = value
+                    listener.fire(self, value)
+
+    def _get_async_lock(self) -> asyncio.Lock:
+        if self._async_lock is None:
+            key = os.path.abspath(self._file_path)
+            lock = _async_locks.get(key)
+            if lock is None:
+                lock = _async_locks[key] = asyncio.Lock()
+            self._async_lock = lock
+        return self._async_lock
+
+    async def _run_write(self, method, *args):
+        if self._owns_transaction():
+            # Inside this task's own transaction only the in-memory tree is touched, the executor would block on the lock this thread holds
+            return method(*args)
+
+        async with self._get_async_lock():
+            return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+    async def aget_data(self, path: str = None, cast: type = None):
+        if self._owns_transaction():
+            return self.get_data(path, cast)
+
+        # The in-memory tree is copied under the lock, unless a writer holds it, then the read waits in the executor
+        if self._lock.acquire(blocking=False):
+            try:
+                data = self._memory_tree()
+                if data is not None:
+                    return self._resolve(data, True, path, cast)
+            finally:
+                self._lock.release()
+
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_data, path, cast)
+
+    async def aexists(self, path: str) -> bool:
+        return await self.aget_data(path) is not None
+
+    async def aset_data(self, path: str, value, default: bool = False):
+        await self._run_write(self.set_data, path, value, default)
+
+    async def aremove(self, path) -> bool:
+        return await self._run_write(self.remove, path)
+
+    async def aflush(self):
+        await self._run_write(self.flush)
 
     def delete(self, *, confirm: bool):
         if confirm:
-            os.remove(self._file_path)
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                self._pending = None
+                self._dirty = False
 
-    def add_property(self, name: str, path: str = None, cast=None, default=None, *, get_wrapper: Callable[['Database', Any], Any] = None, set_validator: Callable[['Database', Any], bool] = None):
-        setattr(self, name, DatabaseProperty(name, path, cast, get_wrapper, set_validator))
-        setattr(self, name, default)
+                if self._watching:
+                    self._unwatch()
+                    self._watching = False
+                self._listeners = []
 
-    def __setattr__(self, key, value):
-        try:
-            v = super(Database, self).__getattribute__(key)
-            if isinstance(v, DatabaseProperty):
-                v.fset(self, value)
-                return
-        except Exception:
-            pass
+                os.remove(self._file_path)
+                self.invalidate_cache()
 
-        super(Database, self).__setattr__(key, value)
+    def add_property(self, name: str, path: str = None, cast=None, default=None, *, get_wrapper: Callable[['Database', Any], Any] = None, set_validator: Callable[['Database', Any], bool] = None, memoize: bool = False):
+        # Properties are descriptors of a subclass owned by this instance only, plain attribute access stays untouched
+        cls = self.__class__
+        if not cls.__dict__.get('_instance_properties', False):
+            cls = type(cls.__name__, (cls,), {'_instance_properties': True, '__module__': cls.__module__, '__qualname__': cls.__qualname__})
+            self.__class__ = cls
 
-    def __getattribute__(self, item):
-        v = super(Database, self).__getattribute__(item)
-        if isinstance(v, DatabaseProperty):
-            return v.fget(self)
-        else:
-            return v
+        prop = DatabaseProperty(name, path, cast, get_wrapper, set_validator, memoize)
+        setattr(cls, name, prop)
+        self._memo.pop(name, None)
+        if default is not None:
+            self.set_data(prop.path, default, default=True)
+
+    def _refresh(self) -> bool:
+        # Brings the in-memory tree up to date, returns False when there is none to memoize against
+        if self._pending is not None:
+            return True
+        if not self._cached:
+            return False
+        self.load_data()
+        return True
 
 
 class JSONDatabase(Database):
-    def __init__(self, file_path: str, create_if_missing: bool = True, default_data=None, encoding='utf8'):
-        super().__init__(file_path, DatabaseEncoder.JSON, create_if_missing, default_data, encoding)
+    def __init__(self, file_path: str, create_if_missing: bool = True, default_data=None, encoding='utf8', *, cached: bool = False, flush_interval: float = None, fsync: FsyncPolicy = FsyncPolicy.Never, encoder: DatabaseEncoder = None):
+        super().__init__(file_path, encoder or DatabaseEncoder.JSON, create_if_missing, default_data, encoding, cached=cached, flush_interval=flush_interval, fsync=fsync)
 
 
 class YAMLDatabase(Database):
-    def __init__(self, file_path: str, create_if_missing: bool = True, default_data=None, encoding='utf8'):
-        super().__init__(file_path, DatabaseEncoder.YAML, create_if_missing, default_data, encoding)
+    def __init__(self, file_path: str, create_if_missing: bool = True, default_data=None, encoding='utf8', *, cached: bool = False, flush_interval: float = None, fsync: FsyncPolicy = FsyncPolicy.Never):
+        super().__init__(file_path, DatabaseEncoder.YAML, create_if_missing, default_data, encoding, cached=cached, flush_interval=flush_interval, fsync=fsync)
+
+
+_extensions = {'json': 'json', 'json-compact': 'json', 'yaml': 'yml'}
+
+
+class ShardedDatabase(Database):
+    """
+    Keeps every top level key in its own file inside `directory`, `set_data('1234.prefix', ...)` only rewrites `1234.json`.
+    At most `max_open_shards` shards stay loaded, the least recently used ones are flushed and dropped.
+    Transactions are atomic per shard, a failing block rolls back every shard it touched and deletes the ones it created.
+    """
+
+    def __init__(self, directory: str, encoder: DatabaseEncoder = None, create_if_missing: bool = True, encoding='utf8', *, max_open_shards: int = 128, cached: bool = True, flush_interval: float = None, fsync: FsyncPolicy = FsyncPolicy.Never, extension: str = None):
+        if not os.path.isdir(directory):
+            if create_if_missing:
+                os.makedirs(directory, exist_ok=True)
+            else:
+                raise FileNotFoundError(f'"{directory}" does not exists')
+        if max_open_shards < 1:
+            raise ValueError(f"max_open_shards must be positive not '{max_open_shards}'")
+
+        self._file_path = directory
+        self._encoding = encoding
+        self._encoder = encoder or DatabaseEncoder.JSON
+        # Caching and deferred writes are handled by each shard
+        self._init_state(cached, None, fsync)
+        self._shard_options = {'cached': cached, 'flush_interval': flush_interval, 'fsync': fsync}
+        self._extension = extension or _extensions.get(self._encoder.format, self._encoder.format)
+        self._max_open_shards = max_open_shards
+        self._shards: 'OrderedDict[str, Database]' = OrderedDict()
+        self._transaction: Optional[ExitStack] = None
+        self._joined = set()
+        # Shards watched for the keys of the registered change listeners
+        self._watched = set()
+        # Shards whose file was created by the open transaction, they are deleted again if it is rolled back
+        self._created = set()
+
+    @property
+    def cache_hits(self) -> int:
+        return self._cache_hits + sum(shard.cache_hits for shard in list(self._shards.values()))
+
+    @property
+    def cache_misses(self) -> int:
+        return self._cache_misses + sum(shard.cache_misses for shard in list(self._shards.values()))
+
+    @property
+    def open_shards(self) -> List[str]:
+        return list(self._shards.keys())
+
+    def reset_cache_stats(self):
+        super().reset_cache_stats()
+        for shard in list(self._shards.values()):
+            shard.reset_cache_stats()
+
+    def invalidate_cache(self):
+        for shard in list(self._shards.values()):
+            shard.invalidate_cache()
+
+    def keys(self) -> List[str]:
+        suffix = f'.{self._extension}'
+        return [name[:-len(suffix)] for name in sorted(os.listdir(self._file_path)) if name.endswith(suffix) and not name.startswith('.')]
+
+    def on_change(self, path: str, callback: Callable[['Database', Optional[str], Any], Any]):
+        """
+        Same as `Database.on_change` except `path` is required, only the file of its shard is watched
+        """
+        if path is None:
+            raise ValueError('ShardedDatabase change listeners require a path, each shard file is watched on its own')
+        with self._lock:
+            super().on_change(path, callback)
+            self._watch()
+
+    def remove_change_listener(self, callback: Callable[['Database', Optional[str], Any], Any]):
+        with self._lock:
+            super().remove_change_listener(callback)
+            if self._watching:
+                self._watch()
+
+    def _watch(self):
+        keys = {self._split(listener.path)[0] for listener in self._listeners}
+        for key in keys - self._watched:
+            get_watcher().watch(self._shard_path(key), self._file_changed)
+        for key in self._watched - keys:
+            get_watcher().unwatch(self._shard_path(key), self._file_changed)
+        self._watched = keys
+
+    def _unwatch(self):
+        for key in self._watched:
+            get_watcher().unwatch(self._shard_path(key), self._file_changed)
+        self._watched = set()
+
+    def _refresh(self) -> bool:
+        # Shards come and go with the LRU, memoized values can not be tracked across them
+        return False
+
+    def _shard_path(self, key: str) -> str:
+        if not key or key.startswith('.') or '/' in key or '\\' in key:
+            raise ValueError(f"'{key}' can not be used as a shard name")
+        return os.path.join(self._file_path, f'{key}.{self._extension}')
+
+    def _shard(self, key: str, create: bool) -> Optional[Database]:
+        with self._lock:
+            shard = self._shards.get(key)
+            if shard is None:
+                file_path = self._shard_path(key)
+                if not os.path.exists(file_path):
+                    if not create:
+                        return None
+                    if self._transaction is not None:
+                        self._created.add(key)
+
+                shard = Database(file_path, self._encoder, True, None, self._encoding, **self._shard_options)
+                self._shards[key] = shard
+            else:
+                self._shards.move_to_end(key)
+
+            if self._transaction is not None and key not in self._joined:
+                self._transaction.enter_context(shard.transaction())
+                self._joined.add(key)
+
+            self._evict()
+            return shard
+
+    def _evict(self):
+        for key in list(self._shards.keys()):
+            if len(self._shards) <= self._max_open_shards:
+                return
+            if key in self._joined:
+                continue
+
+            shard = self._shards.pop(key)
+            shard.flush()
+            self._cache_hits += shard.cache_hits
+            self._cache_misses += shard.cache_misses
+
+    def _release(self, key: str) -> Optional[Database]:
+        with self._lock:
+            shard = self._shards.pop(key, None)
+            self._joined.discard(key)
+            if shard is not None:
+                self._cache_hits += shard.cache_hits
+                self._cache_misses += shard.cache_misses
+            return shard
+
+    @staticmethod
+    def _split(path: str) -> Tuple[str, Optional[str]]:
+        key, _, rest = path.partition('.')
+        return key, rest or None
+
+    def flush(self):
+        with self._lock:
+            for shard in list(self._shards.values()):
+                shard.flush()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._transaction is not None:
+                self._enter()
+                try:
+                    yield self
+                finally:
+                    self._exit()
+                return
+
+            self._enter()
+            try:
+                with ExitStack() as stack:
+                    self._transaction = stack
+                    try:
+                        yield self
+                    finally:
+                        self._transaction = None
+                        self._joined = set()
+            except BaseException:
+                for key in self._created:
+                    self._discard(key)
+                raise
+            finally:
+                self._created = set()
+                self._exit()
+                self._evict()
+
+    def load_data(self) -> dict:
+        return {key: self.get_data(key) for key in self.keys()}
+
+    def save_data(self, data: dict):
+        with self.transaction():
+            for key in self.keys():
+                if key not in data:
+                    self.remove(key)
+            for key, value in data.items():
+                self.set_data(str(key), value)
+
+    def get_data(self, path: str = None, cast: type = None):
+        if path is None:
+            return self.load_data()
+
+        key, rest = self._split(path)
+        shard = self._shard(key, create=False)
+        if shard is None:
+            return None
+        return shard.get_data(rest, cast)
+
+    def view_data(self, path: str = None, cast: type = None):
+        if path is None:
+            return _view(self.load_data())
+
+        key, rest = self._split(path)
+        shard = self._shard(key, create=False)
+        if shard is None:
+            return None
+        return shard.view_data(rest, cast)
+
+    def set_data(self, path: str, value, default: bool = False):
+        key, rest = self._split(path)
+        if rest is not None:
+            return self._shard(key, create=True).set_data(rest, value, default)
+
+        if not isinstance(value, dict):
+            raise TypeError(f"Top level values of a ShardedDatabase are shards which only accept `dict` not '{type(value)}'")
+        if default and (key in self._shards or os.path.exists(self._shard_path(key))):
+            return
+
+        shard = self._shard(key, create=True)
+        with shard._lock:
+            tree = shard._write_tree()
+            tree.clear()
+            tree.update(copy.deepcopy(value))
+            shard._commit_tree(tree)
+
+    def remove(self, path) -> bool:
+        key, rest = self._split(path)
+        if rest is not None:
+            shard = self._shard(key, create=False)
+            return False if shard is None else shard.remove(rest)
+
+        # Removing a whole shard deletes its file, this is not rolled back by a transaction
+        return self._discard(key)
+
+    def _discard(self, key: str) -> bool:
+        shard = self._release(key)
+        if shard is not None:
+            shard.delete(confirm=True)
+            return True
+
+        file_path = self._shard_path(key)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            return True
+        return False
+
+    def delete(self, *, confirm: bool):
+        if confirm:
+            with self._lock:
+                if self._watching:
+                    self._unwatch()
+                    self._watching = False
+                self._listeners = []
+
+            for key in self.keys():
+                self.remove(key)
+            with suppress(OSError):
+                os.rmdir(self._file_path)
@@ -0,0 +1,91 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple, Iterable, Any
+
+from .database import Database
+from .translation import get_catalog
+
+
+class LanguageResolver:
+    """
+    Picks the language of a command context: the user's choice, then the guild's, then the interaction locale, then `default`.
+    Choices are read from `database` at `user_path`/`guild_path` and kept in memory for `ttl` seconds.
+    Only `languages` are accepted, by default the ones found in the translation catalog.
+    """
+
+    def __init__(self, database: Optional[Database] = None, default: str = 'EN', *, guild_path: str = 'guilds.{id}.language', user_path: str = 'users.{id}.language',
+                 locales: Dict[str, str] = None, languages: Iterable[str] = None, ttl: float = 300, max_size: int = 100000):
+        self.database = database
+        self.default = default
+        self.guild_path = guild_path
+        self.user_path = user_path
+        self.locales = locales or {}
+        self.ttl = ttl
+        self.max_size = max_size
+        self._languages = set(languages) if languages is not None else None
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[str, int], Tuple[float, Optional[str]]] = {}
+
+    @property
+    def languages(self) -> set:
+        if self._languages is None:
+            self._languages = set(get_catalog().available_languages()) or {self.default}
+        return self._languages
+
+    def _stored(self, kind: str, path: str, target_id: Optional[int]) -> Optional[str]:
+        if target_id is None or self.database is None:
+            return None
+
+        key = (kind, target_id)
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        language = self.database.view_data(path.format(id=target_id))
+        if not isinstance(language, str):
+            # Anything else stored there, e.g. a mapping, is not a language
+            language = None
+        with self._lock:
+            if len(self._cache) >= self.max_size:
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+                if len(self._cache) >= self.max_size:
+                    self._cache.clear()
+            self._cache[key] = (now + self.ttl, language)
+        return language
+
+    def _from_locale(self, locale: Optional[str]) -> Optional[str]:
+        if not locale:
+            return None
+        return self.locales.get(locale) or self.locales.get(locale.split('-')[0]) or locale.split('-')[0].upper()
+
+    def resolve(self, ctx: Any) -> str:
+        author = getattr(ctx, 'author', None)
+        guild = getattr(ctx, 'guild', None)
+        user_id = getattr(ctx, 'author_id', None) or getattr(author, 'id', None)
+        guild_id = getattr(ctx, 'guild_id', None) or getattr(guild, 'id', None)
+
+        for language in (self._stored('user', self.user_path, user_id),
+                         self._stored('guild', self.guild_path, guild_id),
+                         self._from_locale(getattr(ctx, 'locale', None)),
+                         self._from_locale(getattr(ctx, 'guild_locale', None))):
+            if language in self.languages:
+                return language
+        return self.default
+
+    def set_guild_language(self, guild_id: int, language: str):
+        self.database.set_data(self.guild_path.format(id=guild_id), language)
+        self.invalidate(guild_id=guild_id)
+
+    def set_user_language(self, user_id: int, language: str):
+        self.database.set_data(self.user_path.format(id=user_id), language)
+        self.invalidate(user_id=user_id)
+
+    def invalidate(self, *, guild_id: int = None, user_id: int = None):
+        with self._lock:
+            if guild_id is None and user_id is None:
+                self._cache.clear()
+            if guild_id is not None:
+                self._cache.pop(('guild', guild_id), None)
+            if user_id is not None:
+                self._cache.pop(('user', user_id), None)
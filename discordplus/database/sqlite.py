@@ -0,0 +1,202 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Tuple, Optional
+
+from .database import Database, DatabaseEncoder, FsyncPolicy, _view
+
+# In WAL mode NORMAL only syncs at checkpoints, FULL syncs the log on every commit
+_synchronous = {FsyncPolicy.Never: 'OFF', FsyncPolicy.Commit: 'FULL', FsyncPolicy.Always: 'EXTRA'}
+
+
+def _flatten(path: str, value, rows: List[Tuple[str, str]], encoder: DatabaseEncoder):
+    # Every leaf gets its own row keyed by the full dotted path, empty dicts are kept as leaves so they survive
+    if isinstance(value, dict) and value:
+        for key, item in value.items():
+            _flatten(f'{path}.{key}' if path else str(key), item, rows, encoder)
+    elif path:
+        rows.append((path, encoder.encode(value)))
+
+
+def _prefixes(path: str) -> List[str]:
+    keys = path.split('.')
+    return ['.'.join(keys[:i]) for i in range(1, len(keys))]
+
+
+class SQLiteDatabase(Database):
+    """
+    Stores the tree as one row per leaf, `get_data`/`set_data`/`remove` only read or rewrite the rows under the given path.
+    Change listeners poll `PRAGMA data_version` every `poll_interval` seconds to notice commits of other connections.
+    """
+    poll_interval: float = 1.0
+
+    def __init__(self, file_path: str, create_if_missing: bool = True, default_data=None, *, fsync: FsyncPolicy = FsyncPolicy.Commit):
+        if not os.path.exists(file_path) and not create_if_missing:
+            raise FileNotFoundError(f'"{file_path}" does not exists')
+
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._file_path = file_path
+        self._encoder = DatabaseEncoder.JSON_COMPACT
+        # Reads always go to SQLite so there is no cache nor pending tree
+        self._init_state(False, None, fsync)
+
+        self._connection = sqlite3.connect(file_path, isolation_level=None, check_same_thread=False, timeout=30)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(f'PRAGMA synchronous={_synchronous[self._fsync]}')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS nodes (path TEXT PRIMARY KEY NOT NULL, value)')
+
+        if default_data and self._connection.execute('SELECT 1 FROM nodes LIMIT 1').fetchone() is None:
+            self.save_data(default_data)
+
+    def _build(self, rows, prefix: str = None) -> dict:
+        tree = {}
+        start = len(prefix) + 1 if prefix else 0
+        for path, value in rows:
+            keys = path[start:].split('.')
+            node = tree
+            for key in keys[:-1]:
+                node = node.setdefault(key, {})
+            node[keys[-1]] = self._encoder.decode(value)
+        return tree
+
+    def _select(self, path: str):
+        return self._connection.execute('SELECT path, value FROM nodes WHERE path = ? OR (path > ? AND path < ?) ORDER BY rowid', (path, path + '.', path + '/')).fetchall()
+
+    def _clear(self, path: str) -> int:
+        return self._connection.execute('DELETE FROM nodes WHERE path = ? OR (path > ? AND path < ?)', (path, path + '.', path + '/')).rowcount
+
+    def _ancestor(self, path: str) -> Optional[Tuple[str, str]]:
+        prefixes = _prefixes(path)
+        if not prefixes:
+            return None
+        return self._connection.execute(f'SELECT path, value FROM nodes WHERE path IN ({", ".join("?" * len(prefixes))})', prefixes).fetchone()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            savepoint = f'level_{self._depth}'
+            self._connection.execute(f'SAVEPOINT {savepoint}')
+            self._enter()
+            try:
+                yield self
+            except BaseException:
+                self._connection.execute(f'ROLLBACK TO {savepoint}')
+                self._connection.execute(f'RELEASE {savepoint}')
+                raise
+            else:
+                self._connection.execute(f'RELEASE {savepoint}')
+            finally:
+                self._exit()
+
+            # Commits of this connection do not change `data_version`
+            if self._depth == 0 and self._listeners:
+                self._file_changed()
+
+    def flush(self):
+        pass
+
+    def load_data(self) -> dict:
+        with self._lock:
+            return self._build(self._connection.execute('SELECT path, value FROM nodes ORDER BY rowid'))
+
+    def save_data(self, data: dict):
+        rows = []
+        _flatten('', data, rows, self._encoder)
+        with self.transaction():
+            self._connection.execute('DELETE FROM nodes')
+            self._connection.executemany('INSERT INTO nodes (path, value) VALUES (?, ?)', rows)
+
+    def get_data(self, path: str = None, cast: type = None):
+        if path is None:
+            return self.load_data()
+
+        with self._lock:
+            rows = self._select(path)
+            if len(rows) == 1 and rows[0][0] == path:
+                data = self._encoder.decode(rows[0][1])
+            elif rows:
+                data = self._build(rows, path)
+            else:
+                # The path may point inside a leaf, i.e. an item of a stored list
+                ancestor = self._ancestor(path)
+                if ancestor is None:
+                    return None
+                return self._resolve(self._encoder.decode(ancestor[1]), False, path[len(ancestor[0]) + 1:], cast)
+
+        return data if cast is None or data is None else cast(data)
+
+    def view_data(self, path: str = None, cast: type = None):
+        # Rows are decoded on every read, there is nothing shared to protect
+        data = self.get_data(path, cast)
+        return _view(data)
+
+    def set_data(self, path: str, value, default: bool = False):
+        rows = []
+        _flatten(path, value, rows, self._encoder)
+        with self.transaction():
+            if default and self._select(path):
+                return
+
+            ancestor = self._ancestor(path)
+            if ancestor is not None:
+                if self._encoder.decode(ancestor[1]) != {}:
+                    raise TypeError(f"'{ancestor[0]}' is not a dict, unable to set '{path}'")
+                self._connection.execute('DELETE FROM nodes WHERE path = ?', (ancestor[0],))
+
+            self._clear(path)
+            self._connection.executemany('INSERT INTO nodes (path, value) VALUES (?, ?)', rows)
+
+    def remove(self, path) -> bool:
+        with self.transaction():
+            if self._clear(path) == 0:
+                return False
+
+            # Keep the emptied parent as `{}` like removing the key from a dict would
+            if '.' in path:
+                parent = path[:path.rfind('.')]
+                if not self._select(parent):
+                    self._connection.execute('INSERT INTO nodes (path, value) VALUES (?, ?)', (parent, self._encoder.encode({})))
+            return True
+
+    def _watch(self):
+        stopped = self._polling = threading.Event()
+        version = self._connection.execute('PRAGMA data_version').fetchone()[0]
+        threading.Thread(target=self._poll, args=(stopped, version), name='discordplus-sqlite-watcher', daemon=True).start()
+
+    def _unwatch(self):
+        self._polling.set()
+
+    def _poll(self, stopped: threading.Event, version: int):
+        while not stopped.wait(self.poll_interval):
+            with self._lock:
+                if stopped.is_set():
+                    return
+                current = self._connection.execute('PRAGMA data_version').fetchone()[0]
+                if current != version:
+                    version = current
+                    self._file_changed()
+
+    def close(self):
+        with self._lock:
+            if self._watching:
+                self._unwatch()
+                self._watching = False
+            self._connection.close()
+
+    def delete(self, *, confirm: bool):
+        if confirm:
+            self.close()
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(self._file_path + suffix):
+                    os.remove(self._file_path + suffix)
+
+
+def migrate_database(source: Database, file_path: str, *, fsync: FsyncPolicy = FsyncPolicy.Commit) -> SQLiteDatabase:
+    database = SQLiteDatabase(file_path, fsync=fsync)
+    database.save_data(source.load_data() or {})
+    return database
+
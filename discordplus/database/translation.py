@@ -1,7 +1,21 @@
-import json
+import copy
+import hashlib
+import os
+import pickle
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Callable, Tuple, Iterable
 
-from .database import YAMLDatabase
+from .database import YAMLDatabase, DatabaseEncoder, FsyncPolicy, _view, _atomic_write
+from discord import Colour
+
+from .watcher import get_watcher
 from ..classes import BotPlus, PreMessage
+from ..lib import ExceptionFormat
 
 
 class TranslationError(Exception):
@@ -10,24 +24,672 @@ class TranslationError(Exception):
     """
 
 
+_PLACEHOLDER = re.compile(r'\{([^{}]+)\}')
+
+
+class _Missing:
+    # Pickled by reference, an absent path is still `_MISSING` once loaded back from a bundle
+    __slots__ = ()
+
+    def __reduce__(self):
+        return '_MISSING'
+
+    def __repr__(self):
+        return '<missing>'
+
+
+_MISSING = _Missing()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"")
+
+
+class Template:
+    """
+    A translation string split once into literal segments and the placeholder slots between them
+    """
+    __slots__ = ('source', 'literals', 'names')
+
+    def __init__(self, source: str):
+        parts = [sys.intern(part) for part in _PLACEHOLDER.split(source)]
+        self.source = source
+        self.literals: Tuple[str, ...] = tuple(parts[0::2])
+        self.names: Tuple[str, ...] = tuple(parts[1::2])
+
+    def render(self, lookup: Callable[[str], Any], escape: bool = True) -> str:
+        if not self.names:
+            return self.source
+
+        parts = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            value = lookup(name)
+            if value is _MISSING:
+                parts.append('{' + name + '}')
+            else:
+                parts.append(_escape(value) if escape else str(value))
+            parts.append(literal)
+        return ''.join(parts)
+
+
+# Translation strings come from the catalog as the same objects every time, their hash is computed only once
+compile_template = lru_cache(maxsize=8192)(Template)
+
+
+def _placeholder_lookup(bot: BotPlus, kwargs: Dict[str, Any], escape_bot: bool = False) -> Callable[[str], Any]:
+    context = bot.get_placeholder_context() if isinstance(bot, BotPlus) else None
+    bot_values = None
+    lowered = None
+
+    def lookup(name: str):
+        nonlocal bot_values, lowered
+        if context is not None:
+            # Only the placeholders the string uses are computed
+            value = context.get(name, _MISSING)
+        else:
+            if bot_values is None:
+                bot_values = bot.get_translation_dict()
+            value = bot_values.get(name, _MISSING)
+        if value is not _MISSING and escape_bot:
+            value = _escape(value)
+        elif value is _MISSING:
+            # kwargs are matched lower cased, a new dict is only built if one of them is not already
+            if lowered is None:
+                lowered = kwargs if all(key == key.lower() for key in kwargs) else {key.lower(): item for key, item in kwargs.items()}
+            value = lowered.get(name, _MISSING)
+        return value
+
+    return lookup
+
+
+class _Constant:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def render(self, lookup: Callable[[str], Any], escape: bool = False):
+        return self.value
+
+
+class _ListNode:
+    __slots__ = ('items',)
+
+    def __init__(self, items: tuple):
+        self.items = items
+
+    def render(self, lookup: Callable[[str], Any], escape: bool = False) -> list:
+        return [item.render(lookup, False) for item in self.items]
+
+
+class _DictNode:
+    __slots__ = ('items',)
+
+    def __init__(self, items: tuple):
+        self.items = items
+
+    def render(self, lookup: Callable[[str], Any], escape: bool = False) -> dict:
+        return {key.render(lookup, False): value.render(lookup, False) for key, value in self.items}
+
+
+def compile_tree(value):
+    """
+    Compiles a translation value once, rendering it afterwards only renders its string keys and leaves
+    """
+    if isinstance(value, str):
+        return compile_template(value)
+    if isinstance(value, dict):
+        # Keys are rendered too and end up as strings, like they did through json
+        return _DictNode(tuple((compile_template(str(key)), compile_tree(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return _ListNode(tuple(compile_tree(item) for item in value))
+    return _Constant(value)
+
+
 def set_placeholders(bot: BotPlus, string: str, escape=True, case_sensitive=False, **kwargs) -> str:
     if type(string) != str:
         return string
 
-    for k, v in (*bot.get_translation_dict().items(), *{k.lower(): v for k, v in kwargs.items()}.items()):
-        v = str(v).replace("\\", "\\\\").replace("\"", "\\\"") if escape else str(v)
-        string = string.replace('{' + k + '}', v)
+    template = compile_template(string)
+    if not template.names:
+        return string
+    return template.render(_placeholder_lookup(bot, kwargs), escape)
+
+
+def _compiled_index(node, path: str, index: Dict[str, Any]):
+    # Same paths as `_index`, pointing into one compiled tree so every subtree is compiled only once
+    index[path] = node
+    if isinstance(node, _DictNode):
+        for key, value in node.items:
+            _compiled_index(value, f'{path}.{key.source}' if path else key.source, index)
+    elif isinstance(node, _ListNode):
+        for i, value in enumerate(node.items):
+            _compiled_index(value, f'{path}.{i}' if path else str(i), index)
+
+
+def _intern(value):
+    # Keys, and strings left untranslated in several languages, are kept once
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {_intern(key): _intern(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_intern(item) for item in value]
+    return value
+
+
+def _remap(table: list, mapping: List[int], size: int, fill) -> list:
+    remapped = [fill] * size
+    for i, value in enumerate(table):
+        remapped[mapping[i]] = value
+    return remapped
+
+
+def _present(table: list) -> set:
+    return {i for i, value in enumerate(table) if value is not _MISSING}
+
+
+def _index(tree, path: str, index: Dict[str, Any]):
+    index[path] = tree
+    if isinstance(tree, dict):
+        for key, value in tree.items():
+            _index(value, f'{path}.{key}' if path else str(key), index)
+    elif isinstance(tree, list):
+        for i, value in enumerate(tree):
+            _index(value, f'{path}.{i}' if path else str(i), index)
+
+
+def _sizeof(value, seen: set) -> int:
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_sizeof(v, seen) for v in value)
+    return size
+
+
+# Only rendered messages of these argument types are cached, anything else (files, views, ...) may not be reused
+_cacheable = (str, int, float, bool, type(None), Colour)
+
+
+class PreMessageCache:
+    """
+    LRU of rendered `PreMessage` objects, entries expire after `ttl` seconds since bot placeholders change over time
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60):
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive not '{max_size}'")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[tuple, Tuple[float, PreMessage]]' = OrderedDict()
+
+    @staticmethod
+    def key(bot: BotPlus, language: str, file: str, path: Optional[str], kwargs: Dict[str, Any]) -> Optional[tuple]:
+        if not all(isinstance(value, _cacheable) for value in kwargs.values()):
+            return None
+        # 1, True and 1.0 are equal but render differently, the type keeps them apart
+        return id(bot), language, file.lower(), path, frozenset((key, type(value), value) for key, value in kwargs.items())
+
+    def get(self, key: tuple) -> Optional[PreMessage]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, premessage: PreMessage):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, premessage)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+BUNDLE_NAME = 'translations.bundle'
+_BUNDLE_VERSION = 2
+
+
+def _digest(file_path: str) -> str:
+    with open(file_path, 'rb') as file:
+        return hashlib.blake2b(file.read(), digest_size=16).hexdigest()
+
 
-    return string
+def _sources(directory: str) -> Dict[str, str]:
+    sources = {}
+    for language in sorted(os.listdir(directory)):
+        if os.path.isdir(os.path.join(directory, language)):
+            for name in sorted(os.listdir(os.path.join(directory, language))):
+                if name.endswith('.yml'):
+                    sources[f'{language}/{name}'] = _digest(os.path.join(directory, language, name))
+    return sources
+
+
+def _parent(path: str) -> str:
+    return path[:path.rfind('.')] if '.' in path else ''
+
+
+def _covered(path: str, used: set) -> bool:
+    while path:
+        if path in used:
+            return True
+        path = _parent(path)
+    return False
+
+
+def _topmost(paths: set) -> List[str]:
+    # A missing subtree is reported once, not once per leaf
+    return sorted(path for path in paths if _parent(path) == '' or _parent(path) not in paths)
+
+
+def _location(file: str, path: str) -> str:
+    return f'{file}:{path}' if path else f'{file} (whole file)'
+
+
+class TranslationReport:
+    """
+    Differences of every language against `reference`, as `language -> file -> paths`.
+    A file missing as a whole is reported as the path `''`.
+    """
+
+    def __init__(self, reference: str):
+        self.reference = reference
+        self.missing: Dict[str, Dict[str, List[str]]] = {}
+        self.extra: Dict[str, Dict[str, List[str]]] = {}
+        self.placeholders: Dict[str, Dict[str, List[Tuple[str, List[str], List[str]]]]] = {}
+        self.unused: Dict[str, List[str]] = {}
+        self.coverage: Dict[str, float] = {}
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing or self.placeholders)
+
+    def __str__(self):
+        lines = []
+        for language, ratio in self.coverage.items():
+            lines.append(f'{language}: {ratio:.1%} of {self.reference}')
+            for file, paths in self.missing.get(language, {}).items():
+                lines.extend(f'  missing  {_location(file, path)}' for path in paths)
+            for file, mismatches in self.placeholders.get(language, {}).items():
+                for path, missing, extra in mismatches:
+                    lines.append(f'  placeholders  {_location(file, path)}' + (f' missing {{{"}, {".join(missing)}}}' if missing else '') + (f' unknown {{{"}, {".join(extra)}}}' if extra else ''))
+            for file, paths in self.extra.get(language, {}).items():
+                lines.extend(f'  extra  {_location(file, path)}' for path in paths)
+        for file, paths in self.unused.items():
+            lines.extend(f'unused  {_location(file, path)}' for path in paths)
+        return '\n'.join(lines)
+
+
+class TranslationCatalog:
+    """
+    Every `<directory>/<LANGUAGE>/<file>.yml` parsed once into a table per language and file, indexed by path ids shared by all languages.
+    A language is loaded on its first lookup, or up front with `load`. Values are shared, never mutate them.
+    Languages come from `bundle`, written by `compile_bundle`, as long as it matches the YAML files.
+    """
+
+    def __init__(self, directory: str = './translations', encoder: DatabaseEncoder = None, bundle: str = None):
+        self.directory = directory
+        self.bundle_path = bundle or os.path.join(directory, BUNDLE_NAME)
+        self._encoder = encoder or DatabaseEncoder.YAML
+        self._lock = threading.RLock()
+        # Ids are only ever added, a table built before a path was known is just shorter
+        self._ids: Dict[str, Dict[str, int]] = {}
+        self._languages: Dict[str, Dict[str, list]] = {}
+        self._compiled: Dict[Tuple[str, str, str], Any] = {}
+        self._bundle = None
+        self._bundle_ids: Dict[str, Optional[List[int]]] = {}
+        self._bundled: Dict[Tuple[str, str], list] = {}
+        self.premessage_cache: Optional[PreMessageCache] = None
+        self._watching = False
+
+    def file_path(self, language: str, file: str) -> str:
+        return f'{self.directory}/{language}/{file.lower()}.yml'
+
+    def available_languages(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if os.path.isdir(os.path.join(self.directory, name)))
+
+    @property
+    def languages(self) -> List[str]:
+        return list(self._languages.keys())
+
+    def files(self, language: str) -> List[str]:
+        return list(self._language(language).keys())
+
+    def _parse(self, file_path: str) -> dict:
+        with open(file_path, 'rb' if self._encoder.binary else 'r', encoding=None if self._encoder.binary else 'utf8') as file:
+            tree = self._encoder.decode(file.read())
+        if tree is None:
+            return {}
+        if not isinstance(tree, dict):
+            raise TranslationError(f'"{file_path}" must contain a mapping not {type(tree).__name__}')
+        return tree
+
+    def _table(self, file: str, index: Dict[str, Any], fill=_MISSING) -> list:
+        ids = self._ids.setdefault(file, {})
+        for path in index:
+            if path not in ids:
+                ids[sys.intern(path)] = len(ids)
+        table = [fill] * len(ids)
+        for path, value in index.items():
+            table[ids[path]] = value
+        return table
+
+    def _read(self, file: str, file_path: str) -> list:
+        index = {}
+        _index(_intern(self._parse(file_path)), '', index)
+        return self._table(file, index)
+
+    def _get_bundle(self) -> dict:
+        if self._bundle is None:
+            self._bundle = {}
+            if os.path.exists(self.bundle_path):
+                try:
+                    with open(self.bundle_path, 'rb') as file:
+                        bundle = pickle.load(file)
+                    # Hashing the sources is far cheaper than parsing them, a stale bundle is ignored
+                    if bundle.get('version') == _BUNDLE_VERSION and bundle.get('sources') == _sources(self.directory):
+                        self._bundle = bundle
+                except Exception as error:
+                    ExceptionFormat(error).print(message=f'Unable to load "{self.bundle_path}", falling back to YAML')
+        return self._bundle
+
+    def _bundle_mapping(self, file: str) -> Optional[List[int]]:
+        # The bundle's path ids translated to the catalog's, None when they already match
+        if file not in self._bundle_ids:
+            ids = self._ids.setdefault(file, {})
+            paths = self._bundle['paths'][file]
+            for path in paths:
+                if path not in ids:
+                    ids[path] = len(ids)
+            mapping = [ids[path] for path in paths]
+            self._bundle_ids[file] = None if mapping == list(range(len(paths))) else mapping
+        return self._bundle_ids[file]
+
+    def _load_bundled(self, language: str) -> Optional[Dict[str, list]]:
+        bundle = self._get_bundle()
+        files = bundle.get('languages', {}).get(language)
+        if files is None:
+            return None
+
+        tables = {}
+        for file, table in files.items():
+            nodes = bundle['compiled'][language][file]
+            mapping = self._bundle_mapping(file)
+            if mapping is not None:
+                table = _remap(table, mapping, len(self._ids[file]), _MISSING)
+                nodes = _remap(nodes, mapping, len(self._ids[file]), None)
+            tables[file] = table
+            self._bundled[(language, file)] = nodes
+        return tables
+
+    def _load_language(self, language: str) -> Dict[str, list]:
+        files = {}
+        directory = f'{self.directory}/{language}'
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith('.yml'):
+                    files[name[:-4].lower()] = self._read(name[:-4].lower(), f'{directory}/{name}')
+        return files
+
+    def _language(self, language: str) -> Dict[str, list]:
+        files = self._languages.get(language)
+        if files is None:
+            with self._lock:
+                files = self._languages.get(language)
+                if files is None:
+                    files = self._load_bundled(language)
+                    if files is None:
+                        files = self._load_language(language)
+                    self._languages[language] = files
+        return files
+
+    def load(self, *languages: str):
+        """
+        Loads the given languages, or every language found in the directory, meant to be called at startup
+        """
+        for language in languages or self.available_languages():
+            self._language(language)
+
+    def reload(self, language: str = None, file: str = None):
+        with self._lock:
+            self._compiled = {}
+            if self.premessage_cache is not None:
+                self.premessage_cache.clear()
+            if language is None:
+                self._bundle = None
+                self._bundle_ids.clear()
+                self._bundled.clear()
+                languages = set(self._languages.keys())
+                self._languages.clear()
+                self.load(*languages)
+            elif file is None:
+                self._bundled = {key: nodes for key, nodes in self._bundled.items() if key[0] != language}
+                self._languages[language] = self._load_language(language)
+            else:
+                self._bundled.pop((language, file.lower()), None)
+                files = dict(self._language(language))
+                file_path = self.file_path(language, file)
+                if os.path.exists(file_path):
+                    files[file.lower()] = self._read(file.lower(), file_path)
+                else:
+                    files.pop(file.lower(), None)
+                # Swapped as a whole, readers never see a half updated language
+                self._languages[language] = files
+
+    def lookup(self, language: str, file: str, path: str = None):
+        file = file.lower()
+        table = self._language(language).get(file)
+        if table is None:
+            return None
+        i = self._ids[file].get(path or '')
+        if i is None or i >= len(table):
+            return None
+        value = table[i]
+        return None if value is _MISSING else value
+
+    def enable_premessage_cache(self, max_size: int = 1024, ttl: float = 60) -> PreMessageCache:
+        """
+        Opt-in, `Translation.get_premessage` then reuses rendered messages of the same language, path and arguments
+        """
+        self.premessage_cache = PreMessageCache(max_size, ttl)
+        return self.premessage_cache
+
+    def disable_premessage_cache(self):
+        self.premessage_cache = None
+
+    def compiled(self, language: str, file: str, path: str = None):
+        key = (language, file.lower(), path or '')
+        node = self._compiled.get(key)
+        if node is None:
+            self._language(language)
+            nodes = self._bundled.get(key[:2])
+            i = self._ids.get(key[1], {}).get(key[2])
+            if nodes is not None and i is not None and i < len(nodes):
+                node = nodes[i]
+            if node is None:
+                node = compile_tree(self.lookup(language, file, path))
+            self._compiled[key] = node
+        return node
+
+    def watch(self):
+        """
+        Reloads a file of an already loaded language as soon as it changes on disk
+        """
+        with self._lock:
+            if self._watching:
+                return
+            self._watching = True
+            for language in self.available_languages():
+                directory = f'{self.directory}/{language}'
+                for name in os.listdir(directory):
+                    if name.endswith('.yml'):
+                        get_watcher().watch(f'{directory}/{name}', lambda language=language, file=name[:-4]: self._file_changed(language, file))
+
+    def _file_changed(self, language: str, file: str):
+        if language in self._languages:
+            try:
+                self.reload(language, file)
+            except Exception:
+                # Half written by an editor, the next event will bring the final content
+                pass
+
+    def validate(self, reference: str = 'EN', used: Dict[str, Iterable[str]] = None) -> TranslationReport:
+        """
+        Compares every language with `reference`: missing and extra paths, and strings using other placeholders.
+        `used` maps a file to the paths the bot reads from it, keys of those files outside of them are reported unused.
+        """
+        self.load()
+        report = TranslationReport(reference)
+        reference_files = self._language(reference)
+
+        for language in self.available_languages():
+            if language == reference:
+                continue
+            files = self._language(language)
+            total = present = 0
+
+            for file, reference_table in reference_files.items():
+                expected = _present(reference_table)
+                total += len(expected)
+                table = files.get(file)
+                if table is None:
+                    report.missing.setdefault(language, {})[file] = ['']
+                    continue
+
+                # Both tables share the path ids, comparing them is comparing sets of ints
+                paths = list(self._ids[file])
+                found = _present(table)
+                present += len(expected & found)
+                if expected - found:
+                    report.missing.setdefault(language, {})[file] = _topmost({paths[i] for i in expected - found})
+                if found - expected:
+                    report.extra.setdefault(language, {})[file] = _topmost({paths[i] for i in found - expected})
+
+                mismatches = []
+                for i in sorted(expected & found):
+                    value, translated = reference_table[i], table[i]
+                    if isinstance(value, str) and isinstance(translated, str) and value != translated:
+                        names, translated_names = set(_PLACEHOLDER.findall(value)), set(_PLACEHOLDER.findall(translated))
+                        if names != translated_names:
+                            mismatches.append((paths[i], sorted(names - translated_names), sorted(translated_names - names)))
+                if mismatches:
+                    report.placeholders.setdefault(language, {})[file] = mismatches
+
+            for file in files.keys() - reference_files.keys():
+                report.extra.setdefault(language, {})[file] = ['']
+            report.coverage[language] = present / total if total else 1.0
+
+        for file, paths in (used or {}).items():
+            table = reference_files.get(file.lower())
+            if table is None:
+                continue
+            index = list(self._ids[file.lower()])
+            index = [index[i] for i in sorted(_present(table))]
+            paths = set(paths)
+            ancestors = {''}
+            for path in paths:
+                while path:
+                    ancestors.add(path)
+                    path = _parent(path)
+            unused = [path for path in index if path and path not in ancestors and _parent(path) in ancestors and not _covered(path, paths)]
+            if unused:
+                report.unused[file.lower()] = sorted(unused)
+        return report
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Approximate bytes used by each loaded language, tables and values included.
+        The path ids are shared by every language and reported by `paths_memory_usage`.
+        """
+        return {language: _sizeof(files, set()) for language, files in list(self._languages.items())}
+
+    def paths_memory_usage(self) -> int:
+        return _sizeof(self._ids, set())
+
+
+def compile_bundle(directory: str = './translations', output: str = None) -> str:
+    """
+    Parses and validates every translation file into one pickled bundle, compiled templates included.
+    Returns the bundle path, by default `<directory>/translations.bundle`.
+    """
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f'"{directory}" does not exists')
+
+    catalog = TranslationCatalog(directory, bundle=output)
+    languages = {}
+    compiled = {}
+    for language in catalog.available_languages():
+        tables = languages[language] = {}
+        nodes = compiled[language] = {}
+        language_directory = os.path.join(directory, language)
+        for name in sorted(os.listdir(language_directory)):
+            if not name.endswith('.yml'):
+                continue
+            tree = _intern(catalog._parse(os.path.join(language_directory, name)))
+            file = name[:-4].lower()
+            # Stored as tables so loading is a single unpickle, templates share their strings with the tree
+            index = {}
+            _index(tree, '', index)
+            tables[file] = catalog._table(file, index)
+            index = {}
+            _compiled_index(compile_tree(tree), '', index)
+            nodes[file] = catalog._table(file, index, None)
+
+    paths = {file: list(ids) for file, ids in catalog._ids.items()}
+    bundle = {'version': _BUNDLE_VERSION, 'sources': _sources(directory), 'paths': paths, 'languages': languages, 'compiled': compiled}
+    _atomic_write(catalog.bundle_path, pickle.dumps(bundle, protocol=pickle.HIGHEST_PROTOCOL), None, False)
+    return catalog.bundle_path
+
+
+_catalogs: Dict[str, TranslationCatalog] = {}
+
+
+def get_catalog(directory: str = './translations') -> TranslationCatalog:
+    catalog = _catalogs.get(directory)
+    if catalog is None:
+        catalog = _catalogs[directory] = TranslationCatalog(directory)
+    return catalog
 
 
 class Translation(YAMLDatabase):
-    def __init__(self, bot: BotPlus, file: str, language: str = 'EN'):
-        super().__init__(f'./translations/{language}/{file.lower()}.yml')
+    """
+    Cheap view of one file of a `TranslationCatalog`, reads never touch the disk.
+    Writes go to the YAML file and reload that file in the catalog.
+    """
+
+    def __init__(self, bot: BotPlus, file: str, language: str = 'EN', catalog: TranslationCatalog = None):
+        self.catalog = catalog or get_catalog()
         self.bot = bot
         self._language = language
         self._file = file
 
+        self._file_path = self.catalog.file_path(language, file)
+        self._encoding = 'utf8'
+        self._encoder = DatabaseEncoder.YAML
+        self._init_state(True, None, FsyncPolicy.Never)
+
     @property
     def language(self):
         return self._language
@@ -35,7 +697,33 @@ class Translation(YAMLDatabase):
     @language.setter
     def language(self, value):
         self._language = value
-        self._file_path = f'./translations/{self._language}/{self._file.lower()}.yml'
+        self._set_file_path(self.catalog.file_path(self._language, self._file))
+
+    def get_data(self, path: str = None, cast: type = None):
+        data = self.catalog.lookup(self._language, self._file, path)
+        if isinstance(data, (dict, list)):
+            data = copy.deepcopy(data)
+        return data if cast is None or data is None or path is None else cast(data)
+
+    def view_data(self, path: str = None, cast: type = None):
+        data = self.catalog.lookup(self._language, self._file, path)
+        if isinstance(data, (dict, list)):
+            return _view(data)
+        return data if cast is None or data is None else cast(data)
+
+    def _write_tree(self) -> dict:
+        if not os.path.exists(self._file_path):
+            os.makedirs(os.path.dirname(self._file_path), exist_ok=True)
+            self.save_data({})
+        return super()._write_tree()
+
+    def _save(self, data: dict, sync: bool):
+        super()._save(data, sync)
+        self.catalog.reload(self._language, self._file)
+
+    def _file_changed(self):
+        self.catalog.reload(self._language, self._file)
+        super()._file_changed()
 
     def get(self, path, **kwargs):
         value = self.get_data(path)
@@ -48,10 +736,24 @@ class Translation(YAMLDatabase):
         return self.get_data(item)
 
     def get_json_translated(self, path: str = None, **kwargs):
-        string = json.dumps(self.get(path))
-        string = set_placeholders(self.bot, string, **kwargs)
-        return json.loads(string, strict=False)
+        node = self.catalog.compiled(self._language, self._file, path)
+        if isinstance(node, Template):
+            # A plain string used to get its bot placeholders escaped before the json round trip, kept as is
+            return node.render(_placeholder_lookup(self.bot, kwargs, escape_bot=True), False)
+        return node.render(_placeholder_lookup(self.bot, kwargs), False)
 
     def get_premessage(self, path: str = None, **kwargs) -> PreMessage:
+        cache = self.catalog.premessage_cache
+        key = None if cache is None else cache.key(self.bot, self._language, self._file, path, kwargs)
+        if key is not None:
+            premessage = cache.get(key)
+            if premessage is not None:
+                return premessage.copy()
+
         value = self.get_json_translated(path, **kwargs)
-        return PreMessage.from_data(self.bot, value, **kwargs)
+        premessage = PreMessage.from_data(self.bot, value, **kwargs)
+        if key is not None:
+            # The cached instance is never handed out, callers may change their copy and its embeds
+            cache.put(key, premessage)
+            return premessage.copy()
+        return premessage
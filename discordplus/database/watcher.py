@@ -0,0 +1,176 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..lib import ExceptionFormat
+
+# inotify(7) flags, the directory is watched since saves replace the file instead of writing into it
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct('iIII')
+
+
+def _load_inotify():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def _stamp(file_path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """
+    Calls the registered callbacks, from a daemon thread, whenever a watched file is written, replaced or deleted.
+    Uses inotify on Linux and falls back to polling the files every `poll_interval` seconds elsewhere.
+    """
+
+    def __init__(self, poll_interval: float = 1.0, use_inotify: bool = True):
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._callbacks: Dict[str, List[Callable[[], None]]] = {}
+        self._stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._thread = None
+        self._stopped = threading.Event()
+
+        self._libc = _load_inotify() if use_inotify else None
+        self._fd = None
+        self._directories: Dict[str, int] = {}
+        self._descriptors: Dict[int, str] = {}
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+            if fd < 0:
+                self._libc = None
+            else:
+                self._fd = fd
+
+    @property
+    def backend(self) -> str:
+        return 'inotify' if self._fd is not None else 'polling'
+
+    def watch(self, file_path: str, callback: Callable[[], None]):
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            self._callbacks.setdefault(file_path, []).append(callback)
+            self._stamps[file_path] = _stamp(file_path)
+            if self._fd is not None:
+                self._add_directory(os.path.dirname(file_path))
+
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name='discordplus-file-watcher', daemon=True)
+                self._thread.start()
+
+    def unwatch(self, file_path: str, callback: Callable[[], None] = None):
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            callbacks = self._callbacks.get(file_path, [])
+            if callback is not None and callback in callbacks:
+                callbacks.remove(callback)
+            if callback is None or not callbacks:
+                self._callbacks.pop(file_path, None)
+                self._stamps.pop(file_path, None)
+
+    def stop(self):
+        self._stopped.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _add_directory(self, directory: str):
+        if directory in self._directories:
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_MASK)
+        if wd < 0:
+            # Most likely out of watches, every file is polled from now on
+            os.close(self._fd)
+            self._fd = None
+            return
+        self._directories[directory] = wd
+        self._descriptors[wd] = directory
+
+    def _run(self):
+        while not self._stopped.is_set():
+            if self._fd is not None:
+                changed = self._read_events()
+            else:
+                self._stopped.wait(self.poll_interval)
+                changed = self._poll()
+
+            for file_path in changed:
+                self._notify(file_path)
+
+    def _read_events(self) -> List[str]:
+        try:
+            readable, _, _ = select.select([self._fd], [], [], self.poll_interval)
+            if not readable:
+                return []
+            buffer = os.read(self._fd, 64 * 1024)
+        except (OSError, ValueError, TypeError):
+            return []
+
+        changed = []
+        offset = 0
+        with self._lock:
+            while offset + _EVENT.size <= len(buffer):
+                wd, mask, cookie, length = _EVENT.unpack_from(buffer, offset)
+                name = buffer[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+                offset += _EVENT.size + length
+
+                directory = self._descriptors.get(wd)
+                if directory is None or not name:
+                    continue
+                file_path = os.path.join(directory, os.fsdecode(name))
+                if file_path in self._callbacks and file_path not in changed:
+                    changed.append(file_path)
+        return changed
+
+    def _poll(self) -> List[str]:
+        changed = []
+        with self._lock:
+            for file_path, stamp in self._stamps.items():
+                current = _stamp(file_path)
+                if current != stamp:
+                    self._stamps[file_path] = current
+                    changed.append(file_path)
+        return changed
+
+    def _notify(self, file_path: str):
+        with self._lock:
+            callbacks = list(self._callbacks.get(file_path, ()))
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as error:
+                ExceptionFormat(error).print(message=f'Unable to notify "{file_path}" change')
+
+
+_watcher: Optional[FileWatcher] = None
+
+
+def get_watcher() -> FileWatcher:
+    global _watcher
+    if _watcher is None:
+        _watcher = FileWatcher()
+    return _watcher
@@ -1,9 +1,28 @@
+import pkgutil
+import threading
+
 import yaml
 
+_Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 class __Emotes:
     def __init__(self, category):
         self.category = category
+        self._emotes = None
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        """
+        Parses the category file on first use, every lookup afterwards is a dict lookup
+        """
+        if self._emotes is None:
+            with self._lock:
+                if self._emotes is None:
+                    emotes = yaml.load(pkgutil.get_data(__name__, f'{self.category}.yml'), Loader=_Loader) or {}
+                    # Names like `100` or `1234` are parsed as ints
+                    self._emotes = {str(name): emote for name, emote in emotes.items()}
+        return self._emotes
 
     def get(self, item, default=None):
         return self.__getitem__(item) or default
@@ -11,10 +30,28 @@ class __Emotes:
     def __getitem__(self, item):
         if not isinstance(item, str):
             raise TypeError(f'Only accepts "str" but "{type(item)}" was given.')
-        import pkgutil
+        return self.load().get(item.lower(), None)
+
+    def lazy(self, item):
+        return _Lazy(lambda: self.get(item))
+
+
+class _Lazy:
+    """
+    Class attribute resolved on its first access, then replaced by the value itself
+    """
 
-        data = pkgutil.get_data(__name__, f'{self.category}.yml')
-        return yaml.safe_load(data).get(item.lower(), None)
+    def __init__(self, resolve):
+        self.resolve = resolve
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        value = self.resolve()
+        setattr(owner, self.name, value)
+        return value
 
 
 People = __Emotes('people')
@@ -26,68 +63,82 @@ Objects = __Emotes('objects')
 Symbols = __Emotes('symbols')
 Flags = __Emotes('flags')
 
+_categories = (People, Nature, Food, Activities, Travel, Objects, Symbols, Flags)
+
+
+class _EmotesMeta(type):
+    def __getattr__(cls, name):
+        # Any emote of any category by name, e.g. `Emotes.pizza`
+        if not name.startswith('_'):
+            for category in _categories:
+                value = category.get(name)
+                if value is not None:
+                    setattr(cls, name, value)
+                    return value
+        raise AttributeError(f"type object '{cls.__name__}' has no attribute '{name}'")
+
 
-class Emotes:
-    grinning = People.get('grinning')
-    sunglasses = People.get('sunglasses')
-    smiling_imp = People.get('smiling_imp')
-    ghost = People.get('ghost')
-    robot = People.get('robot')
-    thumbsup = People.get('thumbsup')
-    thumbsdown = People.get('thumbsdown')
-    point_left = People.get('point_left')
-    point_right = People.get('point_right')
-    point_up = People.get('point_up_2')
-    point_down = People.get('point_down')
-    speaking_head = People.get('speaking_head')
-    bust_in_silhouette = People.get('bust_in_silhouette')
-    busts_in_silhouette = People.get('busts_in_silhouette')
-    first_place = Activities.get('first_place')
-    second_place = Activities.get('second_place')
-    third_place = Activities.get('third_place')
-    medal = Activities.get('medal')
-    military_medal = Activities.get('military_medal')
-    trophy = Activities.get('trophy')
-    computer = Objects.get('computer')
-    keyboard = Objects.get('keyboard')
-    desktop = Objects.get('desktop')
-    mouse_three_button = Objects.get('mouse_three_button')
-    printer = Objects.get('printer')
-    coin = Objects.get('coin')
-    moneybag = Objects.get('moneybag')
-    credit_card = Objects.get('credit_card')
-    gem = Objects.get('gem')
-    pick = Objects.get('pick')
-    axe = Objects.get('axe')
-    hammer = Objects.get('hammer')
-    gear = Objects.get('gear')
-    tada = Objects.get('tada')
-    scroll = Objects.get('scroll')
-    page_with_curl = Objects.get('page_with_curl')
-    page_facing_up = Objects.get('page_facing_up')
-    bookmark_tabs = Objects.get('bookmark_tabs')
-    round_pushpin = Objects.get('round_pushpin')
-    pushpin = Objects.get('pushpin')
-    exclamation = Symbols.get('exclamation')
-    x = Symbols.get('x')
-    white_check_mark = Symbols.get('white_check_mark')
-    question = Symbols.get('question')
-    negative_squared_cross_mark = Symbols.get('negative_squared_cross_mark')
-    trident = Symbols.get('trident')
-    fleur_de_lis = Symbols.get('fleur_de_lis')
-    beginner = Symbols.get('beginner')
-    warning = Symbols.get('warning')
-    arrow_right = Symbols.get('arrow_right')
-    arrow_left = Symbols.get('arrow_left')
-    arrow_up = Symbols.get('arrow_up')
-    arrow_down = Symbols.get('arrow_down')
-    arrow_upper_right = Symbols.get('arrow_upper_right')
-    arrow_lower_right = Symbols.get('arrow_lower_right')
-    arrow_lower_left = Symbols.get('arrow_lower_left')
-    arrow_upper_left = Symbols.get('arrow_upper_left')
-    arrow_forward = Symbols.get('arrow_forward')
-    arrow_backward = Symbols.get('arrow_backward')
-    arrow_up_small = Symbols.get('arrow_up_small')
-    arrow_down_small = Symbols.get('arrow_down_small')
-    numbers = (Symbols.get('zero'), Symbols.get('one'), Symbols.get('two'), Symbols.get('three'), Symbols.get('four'), Symbols.get('five'), Symbols.get('six'), Symbols.get('seven'), Symbols.get('eight'), Symbols.get('nine'))
-    letters = {c: Symbols.get(f'regional_indicator_{c}') for c in 'abcdefghijklmnopqrstuvwxyz'}
+class Emotes(metaclass=_EmotesMeta):
+    grinning = People.lazy('grinning')
+    sunglasses = People.lazy('sunglasses')
+    smiling_imp = People.lazy('smiling_imp')
+    ghost = People.lazy('ghost')
+    robot = People.lazy('robot')
+    thumbsup = People.lazy('thumbsup')
+    thumbsdown = People.lazy('thumbsdown')
+    point_left = People.lazy('point_left')
+    point_right = People.lazy('point_right')
+    point_up = People.lazy('point_up_2')
+    point_down = People.lazy('point_down')
+    speaking_head = People.lazy('speaking_head')
+    bust_in_silhouette = People.lazy('bust_in_silhouette')
+    busts_in_silhouette = People.lazy('busts_in_silhouette')
+    first_place = Activities.lazy('first_place')
+    second_place = Activities.lazy('second_place')
+    third_place = Activities.lazy('third_place')
+    medal = Activities.lazy('medal')
+    military_medal = Activities.lazy('military_medal')
+    trophy = Activities.lazy('trophy')
+    computer = Objects.lazy('computer')
+    keyboard = Objects.lazy('keyboard')
+    desktop = Objects.lazy('desktop')
+    mouse_three_button = Objects.lazy('mouse_three_button')
+    printer = Objects.lazy('printer')
+    coin = Objects.lazy('coin')
+    moneybag = Objects.lazy('moneybag')
+    credit_card = Objects.lazy('credit_card')
+    gem = Objects.lazy('gem')
+    pick = Objects.lazy('pick')
+    axe = Objects.lazy('axe')
+    hammer = Objects.lazy('hammer')
+    gear = Objects.lazy('gear')
+    tada = Objects.lazy('tada')
+    scroll = Objects.lazy('scroll')
+    page_with_curl = Objects.lazy('page_with_curl')
+    page_facing_up = Objects.lazy('page_facing_up')
+    bookmark_tabs = Objects.lazy('bookmark_tabs')
+    round_pushpin = Objects.lazy('round_pushpin')
+    pushpin = Objects.lazy('pushpin')
+    exclamation = Symbols.lazy('exclamation')
+    x = Symbols.lazy('x')
+    white_check_mark = Symbols.lazy('white_check_mark')
+    question = Symbols.lazy('question')
+    negative_squared_cross_mark = Symbols.lazy('negative_squared_cross_mark')
+    trident = Symbols.lazy('trident')
+    fleur_de_lis = Symbols.lazy('fleur_de_lis')
+    beginner = Symbols.lazy('beginner')
+    warning = Symbols.lazy('warning')
+    arrow_right = Symbols.lazy('arrow_right')
+    arrow_left = Symbols.lazy('arrow_left')
+    arrow_up = Symbols.lazy('arrow_up')
+    arrow_down = Symbols.lazy('arrow_down')
+    arrow_upper_right = Symbols.lazy('arrow_upper_right')
+    arrow_lower_right = Symbols.lazy('arrow_lower_right')
+    arrow_lower_left = Symbols.lazy('arrow_lower_left')
+    arrow_upper_left = Symbols.lazy('arrow_upper_left')
+    arrow_forward = Symbols.lazy('arrow_forward')
+    arrow_backward = Symbols.lazy('arrow_backward')
+    arrow_up_small = Symbols.lazy('arrow_up_small')
+    arrow_down_small = Symbols.lazy('arrow_down_small')
+    numbers = _Lazy(lambda: (Symbols.get('zero'), Symbols.get('one'), Symbols.get('two'), Symbols.get('three'), Symbols.get('four'), Symbols.get('five'), Symbols.get('six'), Symbols.get('seven'), Symbols.get('eight'), Symbols.get('nine')))
+    letters = _Lazy(lambda: {c: Symbols.get(f'regional_indicator_{c}') for c in 'abcdefghijklmnopqrstuvwxyz'})
@@ -1 +1,2 @@
 from .__emotes import *
+from .index import EmoteIndex, get_index
@@ -0,0 +1,124 @@
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from .__emotes import _categories
+
+_VARIATION_SELECTOR = '\ufe0f'
+
+
+class EmoteIndex:
+    """
+    Every emote of every category in sorted arrays, prefix queries are a bisect away.
+    Words inside names are indexed too, so `heart` also finds `broken_heart` when searching with `words=True`.
+    """
+
+    def __init__(self, aliases: Dict[str, str] = None):
+        emotes: Dict[str, str] = {}
+        self._category: Dict[str, str] = {}
+        for category in _categories:
+            for name, emote in category.load().items():
+                emotes.setdefault(name, emote)
+                self._category.setdefault(name, category.category)
+
+        self._emotes = emotes
+        self._names: List[str] = sorted(emotes)
+        # (word start, name) for every word after the first one, e.g. ('heart', 'broken_heart')
+        self._words: List[Tuple[str, str]] = sorted((name[i + 1:], name) for name in emotes for i, char in enumerate(name) if char == '_')
+
+        self._reverse: Dict[str, str] = {}
+        for name in self._names:
+            self._reverse.setdefault(emotes[name], name)
+            self._reverse.setdefault(emotes[name].replace(_VARIATION_SELECTOR, ''), name)
+
+        self._aliases: Dict[str, str] = {}
+        self._alias_names: List[str] = []
+        for alias, name in (aliases or {}).items():
+            self.add_alias(alias, name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name: str):
+        return self.get(name) is not None
+
+    def add_alias(self, alias: str, name: str):
+        target = self.resolve(name)
+        if target is None:
+            raise ValueError(f"'{name}' is not an emote name")
+        if alias.lower() not in self._aliases:
+            insort(self._alias_names, alias.lower())
+        self._aliases[alias.lower()] = target
+
+    def resolve(self, name: str) -> Optional[str]:
+        """
+        The emote name behind `name`, an alias never hides an emote of the same name
+        """
+        name = name.lower()
+        return name if name in self._emotes else self._aliases.get(name)
+
+    def get(self, name: str, default=None) -> Optional[str]:
+        name = self.resolve(name)
+        return self._emotes[name] if name is not None else default
+
+    def category(self, name: str) -> Optional[str]:
+        name = self.resolve(name)
+        return self._category[name] if name is not None else None
+
+    def name(self, emote: str) -> Optional[str]:
+        """
+        Reverse lookup, with or without the emoji variation selector
+        """
+        return self._reverse.get(emote) or self._reverse.get(emote.replace(_VARIATION_SELECTOR, ''))
+
+    def aliases(self, name: str) -> List[str]:
+        name = self.resolve(name)
+        return [alias for alias, target in self._aliases.items() if target == name] if name is not None else []
+
+    def search(self, query: str, limit: int = 25, *, words: bool = False) -> List[Tuple[str, str]]:
+        """
+        `(name, emote)` of the names starting with `query`, in alphabetical order.
+        With `words`, names having a word starting with `query` follow, then matching aliases.
+        """
+        query = query.lower()
+        results = []
+        i = bisect_left(self._names, query)
+        while i < len(self._names) and len(results) < limit and self._names[i].startswith(query):
+            results.append(self._names[i])
+            i += 1
+
+        if words and len(results) < limit:
+            found = set(results)
+            i = bisect_left(self._words, (query, ''))
+            while i < len(self._words) and len(results) < limit and self._words[i][0].startswith(query):
+                name = self._words[i][1]
+                if name not in found:
+                    found.add(name)
+                    results.append(name)
+                i += 1
+
+            i = bisect_left(self._alias_names, query)
+            while i < len(self._alias_names) and len(results) < limit and self._alias_names[i].startswith(query):
+                name = self._aliases[self._alias_names[i]]
+                if name not in found:
+                    found.add(name)
+                    results.append(name)
+                i += 1
+
+        return [(name, self._emotes[name]) for name in results]
+
+
+_index: Optional[EmoteIndex] = None
+_lock = threading.Lock()
+
+
+def get_index() -> EmoteIndex:
+    """
+    The shared index, built on first use
+    """
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = EmoteIndex()
+    return _index
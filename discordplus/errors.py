@@ -1,6 +1,6 @@
 import traceback
 from io import StringIO
-from typing import Union
+from typing import Union, List
 
 from discord import Color, File
 from discord.ext.commands import Context
@@ -28,12 +28,27 @@ class InteractionError(Exception):
             kwargs = {arg: getattr(self, arg, None) for arg in self._args}
 
         if translation is None:
-            translation = Translation(bot, "Errors", "EN")
+            resolver = getattr(bot, 'language_resolver', None)
+            translation = Translation(bot, "Errors", resolver.resolve(ctx) if resolver is not None else "EN")
 
         premessage = translation.get_premessage(self._name, color=Color.red(), hidden=True, **kwargs)
         await premessage.send(ctx)
 
 
+def interaction_error_names() -> List[str]:
+    """
+    Names of every defined `InteractionError`, i.e. the keys of the Errors translation the bot may use
+    """
+    names = []
+    classes = [InteractionError]
+    while classes:
+        cls = classes.pop()
+        classes.extend(cls.__subclasses__())
+        if cls._name is not None and cls._name not in names:
+            names.append(cls._name)
+    return names
+
+
 class UnexpectedError(InteractionError):
     """
     Raises when another exception happens unintentionally
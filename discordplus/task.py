@@ -1,6 +1,17 @@
+import asyncio
+import bisect
+import heapq
+import importlib
+import inspect
+import itertools
+import math
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import timedelta, datetime
-
-from discord.ext import tasks
+from typing import List, Optional, Dict, Tuple, Callable, Iterable
 
 from .lib import ExceptionFormat, async_wrapper
 
@@ -27,35 +38,338 @@ class TaskPlusStatus:
         self.last = kwargs.get('last', datetime.fromtimestamp(0))
         self.next = kwargs.get('next', self.last + self.goal)
         self.duration = kwargs.get('duration', timedelta())
-        
 
-class TaskPlus:
-    __tasks = []
 
+_pool_sizes: Dict[str, Optional[int]] = {'thread': 4, 'process': None}
+_executors: Dict[str, Executor] = {}
+_executors_lock = threading.Lock()
+_process_functions: Dict[Tuple[str, str], Callable] = {}
+
+
+def configure_executors(thread_workers: int = None, process_workers: int = None):
+    """
+    Sizes the shared pools of `@TaskPlus.execute(executor=...)`, only pools not created yet are affected
+    """
+    if thread_workers is not None:
+        _pool_sizes['thread'] = thread_workers
+    if process_workers is not None:
+        _pool_sizes['process'] = process_workers
+
+
+def get_executor(kind: str) -> Executor:
+    executor = _executors.get(kind)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(kind)
+            if executor is None:
+                if kind == 'thread':
+                    executor = ThreadPoolExecutor(_pool_sizes['thread'], thread_name_prefix='discordplus-task')
+                elif kind == 'process':
+                    executor = ProcessPoolExecutor(_pool_sizes['process'] or os.cpu_count())
+                else:
+                    raise ValueError(f"executor must be 'thread' or 'process' not '{kind}'")
+                _executors[kind] = executor
+    return executor
+
+
+def shutdown_executors(wait: bool = True):
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+def _run_process_function(module: str, qualname: str):
+    # A spawned worker has not imported the module declaring the runner yet, importing it registers the function again
+    function = _process_functions.get((module, qualname))
+    if function is None:
+        importlib.import_module(module)
+        function = _process_functions[(module, qualname)]
+    return function()
+
+
+def _offload(function, executor: str):
+    if inspect.iscoroutinefunction(function):
+        raise TypeError(f'"{function.__qualname__}" is a coroutine function, only synchronous runners can run on an executor')
+
+    if executor == 'thread':
+        async def run(task):
+            return await asyncio.get_running_loop().run_in_executor(get_executor('thread'), function, task)
+    elif executor == 'process':
+        # Neither the task nor its bot can be pickled, a process runner is called without arguments
+        key = (function.__module__, function.__qualname__)
+        _process_functions[key] = function
+
+        async def run(task):
+            return await asyncio.get_running_loop().run_in_executor(get_executor('process'), _run_process_function, *key)
+    else:
+        raise ValueError(f"executor must be 'thread' or 'process' not '{executor}'")
+    run.executor = executor
+    return run
+
+
+class Histogram:
+    """
+    Counts of observed values per bucket, Prometheus style, quantiles are interpolated inside the bucket they fall in
+    """
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if i == len(self.buckets):
+                    # Above the last bound, the best known answer is that bound
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {'p50': self.quantile(0.5), 'p95': self.quantile(0.95), 'p99': self.quantile(0.99), 'mean': self.mean, 'count': self.count}
+
+
+class RunnerMetrics:
+    """
+    Runs, skips (still running or a failed check) and failures of a runner, its run time and how late it started, in seconds
+    """
+
+    def __init__(self):
+        self.runs = 0
+        self.skips = 0
+        self.failures = 0
+        self.last_error: Optional[BaseException] = None
+        self.last_error_time: Optional[datetime] = None
+        self.latency = Histogram()
+        self.drift = Histogram()
+
+    def failed(self, error: BaseException):
+        self.failures += 1
+        self.last_error = error
+        self.last_error_time = datetime.now()
+
+    def as_dict(self) -> dict:
+        return {
+            'runs': self.runs,
+            'skips': self.skips,
+            'failures': self.failures,
+            'last_error': repr(self.last_error) if self.last_error is not None else None,
+            'last_error_time': self.last_error_time,
+            'latency': self.latency.summary(),
+            'drift': self.drift.summary(),
+        }
+
+
+class TaskRunner:
+    """
+    A runner declared with `@TaskPlus.execute`, bound to one task instance
+    """
+
+    def __init__(self, task: 'TaskPlus', name: str, func, conditions: list, interval: Optional[timedelta], timeout: Optional[float] = None, skip_if_running: bool = True):
+        self.task = task
+        self.name = name
+        self.func = func
+        self.conditions = conditions
+        self._interval = interval
+        self.timeout = timeout
+        self.skip_if_running = skip_if_running
+        self.due: Optional[float] = None
+        self.last_due: Optional[float] = None
+        self.active = 0
+        self.executor: Optional[str] = getattr(func, 'executor', None)
+        self.metrics = RunnerMetrics()
+
+    @property
+    def running(self) -> bool:
+        return self.active > 0
+
+    @property
+    def follows_task(self) -> bool:
+        return self._interval is None
+
+    @property
+    def interval(self) -> timedelta:
+        return self.task.goal if self._interval is None else self._interval
+
+    async def run(self) -> bool:
+        for condition in self.conditions:
+            result = condition(self.task)
+            if inspect.isawaitable(result):
+                result = await result
+            if not result:
+                return False
+
+        await self.func(self.task)
+        return True
+
+    def hold(self) -> asyncio.Future:
+        """
+        `run` which keeps the runner running until it returns, even once a timeout stopped waiting for it.
+        A call on a thread or process can not be cancelled, the next ticks are skipped instead of taking more workers.
+        """
+        future = asyncio.ensure_future(self.run())
+        self.active += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: asyncio.Future):
+        self.active -= 1
+        if not future.cancelled():
+            # The outcome was already reported as a timeout if nobody waited for it
+            future.exception()
+
+    def __repr__(self):
+        return f'<TaskRunner {self.task.__class__.__name__}.{self.name}>'
+
+
+class TaskScheduler:
+    """
+    Drives the runners of every started task from a single timer, a min-heap of `(due, order, runner)` on the monotonic clock.
+    The runners of a task due together are handed to it as one batch, on their own asyncio task so no task delays the timer.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self._heap = []
+        self._order = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._driver: Optional[asyncio.Task] = None
+        self._batches = set()
+
+    def __len__(self):
+        return sum(1 for due, _, runner in self._heap if runner.due == due)
+
+    def schedule(self, runner: TaskRunner, delay: float = 0):
+        runner.due = time.monotonic() + delay
+        heapq.heappush(self._heap, (runner.due, next(self._order), runner))
+        if self._heap[0][2] is runner:
+            self._wakeup.set()
+        if self._driver is None or self._driver.done():
+            self._driver = self.loop.create_task(self._drive())
+
+    def unschedule(self, runner: TaskRunner):
+        # Left in the heap and skipped once popped, `due` no longer matches its entry
+        runner.due = None
+
+    def _pop_due(self, now: float) -> List[TaskRunner]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            at, _, runner = heapq.heappop(self._heap)
+            if runner.due == at:
+                due.append(runner)
+        return due
+
+    async def _drive(self):
+        while self._heap:
+            at, _, runner = self._heap[0]
+            if runner.due != at:
+                heapq.heappop(self._heap)
+                continue
+
+            delay = at - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = time.monotonic()
+            batches: Dict[TaskPlus, List[TaskRunner]] = {}
+            for runner in self._pop_due(now):
+                batches.setdefault(runner.task, []).append(runner)
+                runner.last_due = runner.due
+                # Fixed rate, the ticks a slow runner missed are skipped instead of run in a row to catch up
+                interval = max(runner.interval.total_seconds(), 0.001)
+                runner.due += interval * max(1, math.ceil((now - runner.due) / interval))
+                heapq.heappush(self._heap, (runner.due, next(self._order), runner))
+
+            for task, runners in batches.items():
+                batch = self.loop.create_task(task._run(runners))
+                self._batches.add(batch)
+                batch.add_done_callback(self._batches.discard)
+
+
+_schedulers: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TaskScheduler]' = weakref.WeakKeyDictionary()
+
+
+def get_scheduler(loop: asyncio.AbstractEventLoop = None) -> TaskScheduler:
+    loop = loop or asyncio.get_event_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = _schedulers[loop] = TaskScheduler(loop)
+    return scheduler
+
+
+class TaskPlus:
     class __Runner:
-        def __init__(self, func, checks=None):
+        def __init__(self, func, checks=None, interval: Optional[timedelta] = None, timeout: Optional[float] = None, skip_if_running: bool = True):
             if checks is None:
                 checks = []
 
-            self.task = None
             self.func = func
             self.conditions = checks
+            self.interval = interval
+            self.timeout = timeout
+            self.skip_if_running = skip_if_running
+            self.name = getattr(func, '__name__', 'runner')
+
+        def __set_name__(self, owner, name):
+            self.name = name
 
-        async def run(self):
-            for condition in self.conditions:
-                if not condition(self.task):
-                    return
+        def __get__(self, instance, owner):
+            if instance is None:
+                return self
+            return instance.get_runner(self.name)
 
-            await self.func(self.task)
+        def bind(self, task: 'TaskPlus') -> TaskRunner:
+            return TaskRunner(task, self.name, self.func, list(self.conditions), self.interval, self.timeout, self.skip_if_running)
 
     @staticmethod
-    def execute(func):
-        try:
-            checks = func.__func_checks__
-        except AttributeError:
-            checks = []
+    def execute(func=None, *, seconds: float = None, minutes: float = None, hours: float = None, timeout: float = None, skip_if_running: bool = True, executor: str = None):
+        """
+        Declares a runner, it runs every interval of its task unless given its own one.
+        A run longer than `timeout` seconds is cancelled, a tick reached while the previous run is still going is skipped unless `skip_if_running` is False.
+        Synchronous runners run on the event loop, or on the shared `'thread'` or `'process'` pool given as `executor`.
+        A process runner is a plain function without `self`, called without arguments.
+        """
+        interval = None
+        if seconds is not None or minutes is not None or hours is not None:
+            interval = timedelta(seconds=seconds or 0, minutes=minutes or 0, hours=hours or 0)
+            if interval <= timedelta():
+                raise ValueError(f"A runner interval must be positive not '{interval}'")
+
+        def decorator(function):
+            try:
+                checks = [async_wrapper(check) for check in function.__func_checks__]
+            except AttributeError:
+                checks = []
 
-        return TaskPlus.__Runner(async_wrapper(func), checks)
+            wrapped = async_wrapper(function) if executor is None else _offload(function, executor)
+            return TaskPlus.__Runner(wrapped, checks, interval, timeout, skip_if_running)
+
+        return decorator if func is None else decorator(func)
 
     @staticmethod
     def check(*conditions):
@@ -71,52 +385,169 @@ class TaskPlus:
             return func
         return decorator
 
-    def __init__(self, bot, *, seconds=0, minutes=1, hours=0):
+    def __init__(self, bot, *, seconds=0, minutes=1, hours=0, scheduler: TaskScheduler = None, concurrent: bool = False, max_concurrency: int = None, name: str = None):
         seconds, minutes, hours = _reformat_time(seconds, minutes, hours)
 
+        self.name = name or self.__class__.__name__
         self.goal = timedelta(seconds=seconds, minutes=minutes, hours=hours)
-        self.average_duration = timedelta()
         self.last_run = datetime.now() - self.goal
-        self.average_run = timedelta()
         self.runs = 0
+        # Sums in seconds on the monotonic clock, the averages are derived from them
+        self._last_tick: Optional[float] = None
+        self._intervals = 0
+        self._interval_sum = 0.0
+        self._duration_sum = 0.0
         self.bot = bot
-        self.set_interval(seconds=seconds, minutes=minutes, hours=hours)
+        self._scheduler = scheduler
+        self._running = False
+        self._starting: Optional[asyncio.Task] = None
+        # Runners due together run one after the other unless `concurrent`, `max_concurrency` caps the runs of this task at any time
+        self.concurrent = concurrent
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be positive not '{max_concurrency}'")
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+
+        # Each instance gets its own runners, declared on its class or any of its bases
+        declarations = {}
+        for cls in reversed(type(self).__mro__):
+            for value in vars(cls).values():
+                if isinstance(value, TaskPlus.__Runner):
+                    declarations[value.name] = value
+        self.runners: List[TaskRunner] = [declaration.bind(self) for declaration in declarations.values()]
+
+        register = getattr(bot, 'register_task', None)
+        if register is not None:
+            register(self)
+
+    @property
+    def scheduler(self) -> TaskScheduler:
+        if self._scheduler is None:
+            self._scheduler = get_scheduler(getattr(self.bot, 'loop', None))
+        return self._scheduler
 
-        for value in self.__class__.__dict__.values():
-            if value.__class__ == TaskPlus.__Runner:
-                self.__tasks.append(value)
-                value.task = self
+    def get_runner(self, name: str) -> Optional[TaskRunner]:
+        for runner in self.runners:
+            if runner.name == name:
+                return runner
+        return None
+
+    @property
+    def average_run(self) -> timedelta:
+        return timedelta(seconds=self._interval_sum / self._intervals) if self._intervals else self.goal
+
+    @property
+    def average_duration(self) -> timedelta:
+        return timedelta(seconds=self._duration_sum / self.runs) if self.runs else timedelta()
 
     def calculate_accuracy(self):
-        self.average_run = (self.average_run * self.runs + (datetime.now() - self.last_run)) / (self.runs + 1)
+        now = time.monotonic()
+        if self._last_tick is not None:
+            self._interval_sum += now - self._last_tick
+            self._intervals += 1
+        self._last_tick = now
         self.last_run = datetime.now()
 
     def calculate_duration(self):
-        self.average_duration = (self.average_duration * self.runs + (datetime.now() - self.last_run)) / (self.runs + 1)
+        self._duration_sum += time.monotonic() - self._last_tick
         self.runs += 1
 
+    def metrics(self) -> Dict[str, dict]:
+        return {runner.name: runner.metrics.as_dict() for runner in self.runners}
+
     def set_interval(self, *, seconds=0, minutes=1, hours=0):
-        self.loop.change_interval(seconds=seconds, minutes=minutes, hours=hours)
+        seconds, minutes, hours = _reformat_time(seconds, minutes, hours)
         self.goal = timedelta(seconds=seconds, minutes=minutes, hours=hours)
+        if self._running and self._starting is None:
+            for runner in self.runners:
+                if runner.follows_task and runner.due is not None:
+                    self.scheduler.unschedule(runner)
+                    self.scheduler.schedule(runner, self.goal.total_seconds())
+
+    def is_running(self) -> bool:
+        return self._running
 
     def start(self):
-        self.loop.start()
+        if self._running:
+            raise RuntimeError('Task is already launched and is not completed.')
+        self._running = True
+        self._starting = self.scheduler.loop.create_task(self._start())
+
+    async def _start(self):
+        await self.wait()
+        self._starting = None
+        if self._running:
+            for runner in self.runners:
+                self.scheduler.schedule(runner)
 
     def stop(self):
-        self.loop.stop()
+        self._running = False
+        if self._starting is not None:
+            self._starting.cancel()
+            self._starting = None
+        for runner in self.runners:
+            self.scheduler.unschedule(runner)
 
-    @tasks.loop(minutes=1)
-    async def loop(self):
-        self.calculate_accuracy()
-        for runner in TaskPlus.__tasks:
-            try:
-                await runner.run()
-            except Exception as error:
-                ExceptionFormat(error).print(message=f'Unable to run "{runner}"')
+    async def _run(self, runners: List[TaskRunner]):
+        for runner in runners:
+            if runner.skip_if_running and runner.running:
+                runner.metrics.skips += 1
+        runners = [runner for runner in runners if not (runner.skip_if_running and runner.running)]
+        if not runners:
+            return
+        for runner in runners:
+            runner.active += 1
 
-        self.calculate_duration()
+        tick = any(runner.follows_task for runner in runners)
+        if tick:
+            self.calculate_accuracy()
+        if self.concurrent:
+            await asyncio.gather(*(self._execute(runner) for runner in runners))
+        else:
+            for runner in runners:
+                await self._execute(runner)
+
+        if tick:
+            self.calculate_duration()
+
+    async def _execute(self, runner: TaskRunner):
+        try:
+            if self._semaphore is not None:
+                async with self._semaphore:
+                    await self._call(runner)
+            else:
+                await self._call(runner)
+        except asyncio.TimeoutError as error:
+            runner.metrics.failed(error)
+            ExceptionFormat(error).print(message=f'"{runner}" did not finish within {runner.timeout} seconds')
+        except Exception as error:
+            runner.metrics.failed(error)
+            ExceptionFormat(error).print(message=f'Unable to run "{runner}"')
+        finally:
+            runner.active -= 1
+
+    @staticmethod
+    async def _call(runner: TaskRunner):
+        start = time.monotonic()
+        if runner.last_due is not None:
+            runner.metrics.drift.observe(max(start - runner.last_due, 0.0))
+        try:
+            if runner.timeout is None:
+                ran = await runner.run()
+            elif runner.executor is None:
+                ran = await asyncio.wait_for(runner.run(), runner.timeout)
+            else:
+                ran = await asyncio.wait_for(asyncio.shield(runner.hold()), runner.timeout)
+        except BaseException:
+            runner.metrics.runs += 1
+            runner.metrics.latency.observe(time.monotonic() - start)
+            raise
+
+        if ran:
+            runner.metrics.runs += 1
+            runner.metrics.latency.observe(time.monotonic() - start)
+        else:
+            runner.metrics.skips += 1
 
-    @loop.before_loop
     async def wait(self):
         await self.bot.wait_until_ready()
 
@@ -125,9 +556,45 @@ class TaskPlus:
         return TaskPlusStatus(
             goal=self.goal,
             average=self.average_run,
-            running=self.loop.is_running(),
+            running=self.is_running(),
             accuracy=round(100 - 100 * max(self.average_run - self.goal, timedelta()) / self.goal, 2),
             last=self.last_run,
             next=self.last_run + self.goal,
             duration=self.average_duration
         )
+
+
+def _label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def export_prometheus(tasks: Iterable[TaskPlus]) -> str:
+    """
+    The metrics of every runner of `tasks` in the Prometheus text exposition format
+    """
+    runners = [(task, runner) for task in tasks for runner in task.runners]
+    lines = []
+    for name, kind, description, value in (
+            ('runs_total', 'counter', 'Finished runs', lambda metrics: metrics.runs),
+            ('skips_total', 'counter', 'Ticks skipped because the runner was still running or a check failed', lambda metrics: metrics.skips),
+            ('failures_total', 'counter', 'Runs that raised or timed out', lambda metrics: metrics.failures)):
+        lines.append(f'# HELP discordplus_task_{name} {description}')
+        lines.append(f'# TYPE discordplus_task_{name} {kind}')
+        for task, runner in runners:
+            lines.append(f'discordplus_task_{name}{{task="{_label(task.name)}",runner="{_label(runner.name)}"}} {value(runner.metrics)}')
+
+    for name, description, attribute in (
+            ('duration_seconds', 'Run time of the runner', 'latency'),
+            ('drift_seconds', 'Delay between when the runner was due and when it started', 'drift')):
+        lines.append(f'# HELP discordplus_task_{name} {description}')
+        lines.append(f'# TYPE discordplus_task_{name} histogram')
+        for task, runner in runners:
+            histogram: Histogram = getattr(runner.metrics, attribute)
+            labels = f'task="{_label(task.name)}",runner="{_label(runner.name)}"'
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                cumulative += count
+                lines.append(f'discordplus_task_{name}_bucket{{{labels},le="{"+Inf" if bound == float("inf") else bound}"}} {cumulative}')
+            lines.append(f'discordplus_task_{name}_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'discordplus_task_{name}_count{{{labels}}} {histogram.count}')
+    return '\n'.join(lines) + '\n'